@@ -1,33 +1,35 @@
-from . import plugin
+import importlib
 from .__about__ import __version__
-from . import fixtures
-from .keysight_u3606_wrapper import (
-    DCOutputMode,
-    DCOutputVoltageRange,
-    DCOutputCurrentRange,
-    MultimeterMode,
-    MultimeterRange,
-    MultimeterResolution,
-    SignalType,
-    CalcFunction,
-    QuestionRegister,
-    KeysightU3606Wrapper,
-    KeysightU3606SupplyAndMultimeter,
-)
-
-from .keysight_u2723_wrapper import (
-    SMUChannel,
-    SMUVoltageRange,
-    SMUCurrentRange,
-    SMUMemoryList,
-    SMUChannelMode,
-    KeysightU2723Wrapper,
-    KeysightU2723SourceMeasureUnit,
-    smu_source_voltage_measure_current,
-    smu_source_current_measure_voltage,
-    create_smu_pulse_current,
-    create_smu_pulse_voltage,
-)
+
+# Public names and the submodule defining them, imported on first access (PEP 562)
+_LAZY_EXPORTS = {
+    "plugin": None,
+    "fixtures": None,
+    "index_resources_by_serial": "instrument_utils",
+    "invalidate_resource_cache": "instrument_utils",
+    "DCOutputMode": "keysight_u3606_wrapper",
+    "DCOutputVoltageRange": "keysight_u3606_wrapper",
+    "DCOutputCurrentRange": "keysight_u3606_wrapper",
+    "MultimeterMode": "keysight_u3606_wrapper",
+    "MultimeterRange": "keysight_u3606_wrapper",
+    "MultimeterResolution": "keysight_u3606_wrapper",
+    "SignalType": "keysight_u3606_wrapper",
+    "CalcFunction": "keysight_u3606_wrapper",
+    "QuestionRegister": "keysight_u3606_wrapper",
+    "KeysightU3606Wrapper": "keysight_u3606_wrapper",
+    "KeysightU3606SupplyAndMultimeter": "keysight_u3606_wrapper",
+    "SMUChannel": "keysight_u2723_wrapper",
+    "SMUVoltageRange": "keysight_u2723_wrapper",
+    "SMUCurrentRange": "keysight_u2723_wrapper",
+    "SMUMemoryList": "keysight_u2723_wrapper",
+    "SMUChannelMode": "keysight_u2723_wrapper",
+    "KeysightU2723Wrapper": "keysight_u2723_wrapper",
+    "KeysightU2723SourceMeasureUnit": "keysight_u2723_wrapper",
+    "smu_source_voltage_measure_current": "keysight_u2723_wrapper",
+    "smu_source_current_measure_voltage": "keysight_u2723_wrapper",
+    "create_smu_pulse_current": "keysight_u2723_wrapper",
+    "create_smu_pulse_voltage": "keysight_u2723_wrapper",
+}
 
 __all__ = [
     "plugin",
@@ -55,4 +57,23 @@ __all__ = [
     "smu_source_current_measure_voltage",
     "create_smu_pulse_current",
     "create_smu_pulse_voltage",
+    "index_resources_by_serial",
+    "invalidate_resource_cache",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name = _LAZY_EXPORTS[name] or name
+    module = importlib.import_module("." + module_name, __name__)
+    value = module if _LAZY_EXPORTS[name] is None else getattr(module, name)
+
+    # cache the resolved attribute, later lookups do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,244 +1,318 @@
+import functools
 import pytest
-import logging
-import pyvisa
+from types import MappingProxyType, SimpleNamespace
 from _pytest.config import Config
+from .plugin import PYPM_SESSION, _open_resource_manager, get_instrument
 from .keysight_u3606_wrapper import (
     KeysightU3606Wrapper,
     DCOutputMode,
     MultimeterMode,
 )
 from .keysight_u2723_wrapper import KeysightU2723Wrapper, SMUChannel
-from typing import Generator, Tuple
+from typing import TYPE_CHECKING, Dict, Generator, List, Tuple
+
+if TYPE_CHECKING:
+    import pyvisa
 
 
 @pytest.fixture(scope="session")
-def pyvisa_session() -> Tuple[pyvisa.ResourceManager, Tuple[str, ...]]:
+def pypm_options(pytestconfig: Config) -> SimpleNamespace:
+    """pytest.ini options of the plugin read at session start, as attributes (e.g. pypm_options.psu_serial_no)"""
+    return pytestconfig.stash[PYPM_SESSION].options
+
+
+@pytest.fixture(scope="session")
+def pyvisa_session(
+    pytestconfig: Config,
+) -> Tuple["pyvisa.ResourceManager", Tuple[str, ...], Dict[str, str]]:
     """
-    Create a Pyvisa Session to be used by Keysight Wrapper classes
+    Pyvisa Session used by Keysight Wrapper classes (shared with the instruments opened at session start)
+
+    Returns: (resource manager, detected devices, detected USB devices keyed by serial number)
     """
-    pyvisa_dev_manager = pyvisa.ResourceManager()
-    pyvisa.log_to_screen(logging.INFO)
-    pyvisa_devices = pyvisa_dev_manager.list_resources()
-    logging.info(f"PyVisa discovered the following devices: {pyvisa_devices}")
+    pypm = pytestconfig.stash[PYPM_SESSION]
+    _open_resource_manager(pypm)
 
-    return (pyvisa_dev_manager, pyvisa_devices)
+    return (pypm.rm, pypm.devices, pypm.serial_index)
 
 
 # Fixtures for the Keysight U3606 DC Power Supply / Multimeter
 #########################################################
-KEYISGHT_MULTIMETER_MODES_MAP = {
-    "voltage": MultimeterMode.VOLTAGE,
-    "current": MultimeterMode.CURRENT,
-    "resistance": MultimeterMode.RESISTANCE,
-}
+KEYISGHT_MULTIMETER_MODES_MAP = MappingProxyType(
+    {
+        "voltage": MultimeterMode.VOLTAGE,
+        "current": MultimeterMode.CURRENT,
+        "resistance": MultimeterMode.RESISTANCE,
+    }
+)
 
 
 @pytest.fixture(scope="session")
-def psu_handle(
-    pytestconfig: Config,
-    pyvisa_session: Tuple[pyvisa.ResourceManager, Tuple[str, ...]],
-) -> Generator[KeysightU3606Wrapper, None, None]:
-    """Initialize an instance of KeysightU3606Wrapper and opens connection to USB connected keysight U3606"""
-
-    if not pytestconfig.getini("psu_serial_no"):
-        logging.warning(
-            "No serial number was specified for U36 PSU. Please specify 'psu_serial_no' option in pytest.ini"
-        )
+def psu_config(pypm_options: SimpleNamespace) -> SimpleNamespace:
+    """
+    U3606 pytest.ini options converted once per test session
 
-    psu_wrapper = KeysightU3606Wrapper(
-        pytestconfig.getini("psu_serial_no"),
-        pyvisa_session[0],
-        pyvisa_session[1],
+    Returns: namespace of serial_no, multimeter_mode (upper case), constant_voltage / constant_current (float or None if not defined)
+    """
+    cv_output_value = pypm_options.psu_constant_voltage_output
+    cc_output_value = pypm_options.psu_constant_current_output
+
+    return SimpleNamespace(
+        serial_no=pypm_options.psu_serial_no,
+        multimeter_mode=(pypm_options.psu_multimeter_mode or "").upper(),
+        constant_voltage=float(cv_output_value) if cv_output_value else None,
+        constant_current=float(cc_output_value) if cc_output_value else None,
     )
 
-    # open connection to instrument
-    psu_wrapper.open()
-
-    # clear presets / status
-    psu_wrapper.clear_presets()
-    psu_wrapper.clear_status()
 
-    yield psu_wrapper
+@functools.lru_cache(maxsize=None)
+def _resolve_multimeter_mode(name: str) -> MultimeterMode:
+    """Validate the 'psu_multimeter_mode' option once and return the matching MultimeterMode"""
+    mulitmeter_mode = KEYISGHT_MULTIMETER_MODES_MAP.get(name)
+    if not mulitmeter_mode:
+        raise RuntimeError(
+            "pytest option: 'psu_multimeter_mode' is not defined or invalid"
+        )
+    return mulitmeter_mode
 
-    # query / clear system errors
-    last_error = psu_wrapper.query_system_errors()
-    logging.info(
-        f"Last error reported by Keysight U3606 instrument: {last_error}"
-    )
 
-    # clear presets / status
-    psu_wrapper.clear_presets()
-    psu_wrapper.clear_status()
+@pytest.fixture(scope="session")
+def psu_handle(
+    pytestconfig: Config, pypm_options: SimpleNamespace
+) -> KeysightU3606Wrapper:
+    """Instance of KeysightU3606Wrapper connected to the USB connected keysight U3606 at session start"""
+    # nothing to connect to, skip instead of failing every test requesting the instrument
+    if not pypm_options.psu_serial_no:
+        pytest.skip(
+            "pytest option: 'psu_serial_no' is not defined in pytest.ini"
+        )
 
-    # close Pyvisa session
-    psu_wrapper.close()
+    return get_instrument(pytestconfig, "psu")
 
 
 @pytest.fixture(scope="session")
 def psu_multimeter(
-    pytestconfig: Config,
+    pypm_options: SimpleNamespace,
     psu_handle: Generator[KeysightU3606Wrapper, None, None],
 ) -> None:
-    mulitmeter_mode = KEYISGHT_MULTIMETER_MODES_MAP.get(
-        pytestconfig.getini("psu_multimeter_mode")
+    mulitmeter_mode = _resolve_multimeter_mode(
+        pypm_options.psu_multimeter_mode
     )
-    if not mulitmeter_mode:
-        raise RuntimeError(
-            "pytest option: 'psu_multimeter_mode' is not defined or invalid"
-        )
     psu_handle.configure_multimeter(mulitmeter_mode)
 
     return psu_handle
 
 
-@pytest.fixture
-def psu_constant_voltage_output(
-    pytestconfig: Config,
+# Instrument storage locations used to snapshot the session output configuration
+# NOTE: the session fixtures overwrite whatever state was stored in these locations
+PSU_CONSTANT_VOLTAGE_STATE = 1
+PSU_CONSTANT_CURRENT_STATE = 2
+
+
+@pytest.fixture(scope="session")
+def _psu_constant_voltage_session(
+    psu_config: SimpleNamespace,
     psu_handle: Generator[KeysightU3606Wrapper, None, None],
     psu_multimeter: None,
 ) -> Generator[KeysightU3606Wrapper, None, None]:
-    cv_output_value = pytestconfig.getini("psu_constant_voltage_output")
-    if not cv_output_value:
+    """Configure and enable the DC supply in CV mode once per test session"""
+    if psu_config.constant_voltage is None:
         raise RuntimeError(
             "pytest option: 'psu_constant_voltage_output' is not defined or invalid"
         )
     psu_handle.configure_dc_supply(
-        DCOutputMode.CONSTANT_VOLTAGE, float(cv_output_value)
+        DCOutputMode.CONSTANT_VOLTAGE, psu_config.constant_voltage
     )
     psu_handle.enable_dc_output()
 
+    # snapshot the configured state, so tests can restore it with a single command
+    psu_handle.save_state(PSU_CONSTANT_VOLTAGE_STATE)
+
     yield psu_handle
 
     psu_handle.disable_dc_output()
 
 
 @pytest.fixture
-def psu_constant_current_output(
-    pytestconfig: Config,
+def psu_constant_voltage_output(
+    _psu_constant_voltage_session: KeysightU3606Wrapper,
+) -> KeysightU3606Wrapper:
+    """Restore the session CV configuration in case a previous test modified the instrument state"""
+    # CV and CC share the output, it is turned off while the other mode's configuration is recalled
+    _psu_constant_voltage_session.batch_write(
+        "OUTP:STAT OFF", "*RCL %s" % PSU_CONSTANT_VOLTAGE_STATE, "OUTP:STAT ON"
+    )
+
+    return _psu_constant_voltage_session
+
+
+@pytest.fixture(scope="session")
+def _psu_constant_current_session(
+    psu_config: SimpleNamespace,
     psu_handle: Generator[KeysightU3606Wrapper, None, None],
     psu_multimeter: None,
 ) -> Generator[KeysightU3606Wrapper, None, None]:
-    cc_output_value = pytestconfig.getini("psu_constant_current_output")
-    if not cc_output_value:
+    """Configure and enable the DC supply in CC mode once per test session"""
+    if psu_config.constant_current is None:
         raise RuntimeError(
             "pytest option: 'psu_constant_current_output' is not defined or invalid"
         )
     psu_handle.configure_dc_supply(
-        DCOutputMode.CONSTANT_CURRENT, float(cc_output_value)
+        DCOutputMode.CONSTANT_CURRENT, psu_config.constant_current
     )
     psu_handle.enable_dc_output()
 
+    # snapshot the configured state, so tests can restore it with a single command
+    psu_handle.save_state(PSU_CONSTANT_CURRENT_STATE)
+
     yield psu_handle
 
     psu_handle.disable_dc_output()
 
 
+@pytest.fixture
+def psu_constant_current_output(
+    _psu_constant_current_session: KeysightU3606Wrapper,
+) -> KeysightU3606Wrapper:
+    """Restore the session CC configuration in case a previous test modified the instrument state"""
+    # CV and CC share the output, it is turned off while the other mode's configuration is recalled
+    _psu_constant_current_session.batch_write(
+        "OUTP:STAT OFF", "*RCL %s" % PSU_CONSTANT_CURRENT_STATE, "OUTP:STAT ON"
+    )
+
+    return _psu_constant_current_session
+
+
 # Fixtures for the Keysight U2723 Source Measure Unit
 #########################################################
 @pytest.fixture(scope="session")
 def smu_handle(
-    pytestconfig: Config,
-    pyvisa_session: Tuple[pyvisa.ResourceManager, Tuple[str, ...]],
-) -> Generator[KeysightU2723Wrapper, None, None]:
-    """Initialize an instance of KeysightU27Wrapper and opens connection to USB connected keysight U2723"""
-
-    if not pytestconfig.getini("smu_serial_no"):
-        logging.warning(
-            "No serial number was specified for U2723 SMU. Please specify 'smu_serial_no' option in pytest.ini"
+    pytestconfig: Config, pypm_options: SimpleNamespace
+) -> KeysightU2723Wrapper:
+    """Instance of KeysightU2723Wrapper connected to the USB connected keysight U2723 at session start"""
+    # nothing to connect to, skip instead of failing every test requesting the instrument
+    if not pypm_options.smu_serial_no:
+        pytest.skip(
+            "pytest option: 'smu_serial_no' is not defined in pytest.ini"
         )
 
-    smu_wrapper = KeysightU2723Wrapper(
-        pytestconfig.getini("smu_serial_no"),
-        pyvisa_session[0],
-        pyvisa_session[1],
-    )
-
-    # open connection to instrument
-    smu_wrapper.open()
-
-    # clear presets / status
-    smu_wrapper.clear_presets()
-    smu_wrapper.clear_status()
+    return get_instrument(pytestconfig, "smu")
 
-    yield smu_wrapper
 
-    # query / clear system errors
-    last_error = smu_wrapper.query_system_errors()
-    logging.info(
-        f"Last error reported by Keysight U2723 instrument: {last_error}"
-    )
+# Instrument storage locations used to snapshot the session output configuration
+# NOTE: the session fixtures overwrite whatever state was stored in these locations
+SMU_VOLTAGE_SOURCE_STATE = 1
+SMU_CURRENT_SOURCE_STATE = 2
 
-    # clear presets / status
-    smu_wrapper.clear_presets()
-    smu_wrapper.clear_status()
+# the voltage and current source sessions may both be alive, each one starts from all channels off
+_SMU_ALL_CHANNELS_OFF = "OUTP 0, (@%s)" % ",".join(
+    str(channel.value) for channel in SMUChannel
+)
 
-    # close Pyvisa session
-    smu_wrapper.close()
+# pytest.ini options holding the source level of each SMU channel
+_SMU_V_INI = (
+    (SMUChannel.CH1, "smu_ch_1_source_voltage"),
+    (SMUChannel.CH2, "smu_ch_2_source_voltage"),
+    (SMUChannel.CH3, "smu_ch_3_source_voltage"),
+)
+_SMU_I_INI = (
+    (SMUChannel.CH1, "smu_ch_1_source_current"),
+    (SMUChannel.CH2, "smu_ch_2_source_current"),
+    (SMUChannel.CH3, "smu_ch_3_source_current"),
+)
 
 
-@pytest.fixture
-def smu_voltage_source(
-    pytestconfig: Config,
+@pytest.fixture(scope="session")
+def _smu_voltage_source_session(
+    pypm_options: SimpleNamespace,
     smu_handle: Generator[KeysightU2723Wrapper, None, None],
-) -> Generator[KeysightU2723Wrapper, None, None]:
-    ch_1_volt = pytestconfig.getini("smu_ch_1_source_voltage")
-    ch_2_volt = pytestconfig.getini("smu_ch_2_source_voltage")
-    ch_3_volt = pytestconfig.getini("smu_ch_3_source_voltage")
-
-    if (ch_1_volt is None) and (ch_2_volt is None) and (ch_3_volt is None):
+) -> Generator[Tuple[KeysightU2723Wrapper, List[SMUChannel]], None, None]:
+    """Set the source voltage and enable the configured SMU channels once per test session"""
+    src_levels = {
+        channel: float(value)
+        for channel, option in _SMU_V_INI
+        if (value := getattr(pypm_options, option))
+    }
+
+    if not src_levels:
         raise RuntimeError(
             "pytest options: 'smu_ch_1_source_voltage, smu_ch_2_source_voltage, smu_ch_3_source_voltage' are not defined"
         )
 
-    if ch_1_volt:
-        smu_handle.set_smu_source_voltage(SMUChannel.CH1, float(ch_1_volt))
-        smu_handle.enable_smu_channel(SMUChannel.CH1)
-
-    if ch_2_volt:
-        smu_handle.set_smu_source_voltage(SMUChannel.CH2, float(ch_2_volt))
-        smu_handle.enable_smu_channel(SMUChannel.CH2)
+    # turn off the channels enabled by the other source session, then set all channels and
+    # enable their outputs in one go
+    smu_handle.batch_write(_SMU_ALL_CHANNELS_OFF)
+    smu_handle.apply_source_voltages(src_levels)
+    enabled_channels = list(src_levels)
 
-    if ch_3_volt:
-        smu_handle.set_smu_source_voltage(SMUChannel.CH3, float(ch_3_volt))
-        smu_handle.enable_smu_channel(SMUChannel.CH3)
+    # snapshot the configured state, so tests can restore it with a single command
+    smu_handle.save_state(SMU_VOLTAGE_SOURCE_STATE)
 
-    yield smu_handle
+    yield smu_handle, enabled_channels
 
-    smu_handle.disable_smu_channel(SMUChannel.CH1)
-    smu_handle.disable_smu_channel(SMUChannel.CH2)
-    smu_handle.disable_smu_channel(SMUChannel.CH3)
-    smu_handle.clear_presets()
+    # disable all channels in one go (presets are cleared when the session closes the instrument)
+    smu_handle.batch_write(_SMU_ALL_CHANNELS_OFF)
 
 
 @pytest.fixture
-def smu_current_source(
-    pytestconfig: Config,
-    smu_handle: Generator[KeysightU2723Wrapper, None, None],
-) -> Generator[KeysightU2723Wrapper, None, None]:
-    ch_1_curr = pytestconfig.getini("smu_ch_1_source_current")
-    ch_2_curr = pytestconfig.getini("smu_ch_2_source_current")
-    ch_3_curr = pytestconfig.getini("smu_ch_3_source_current")
+def smu_voltage_source(
+    _smu_voltage_source_session: Tuple[KeysightU2723Wrapper, List[SMUChannel]],
+) -> KeysightU2723Wrapper:
+    """Restore the session source voltage configuration in case a previous test modified the instrument state"""
+    smu_handle, enabled_channels = _smu_voltage_source_session
+    smu_handle.batch_write(
+        "*RCL %s" % SMU_VOLTAGE_SOURCE_STATE,
+        _SMU_ALL_CHANNELS_OFF,
+        "OUTP 1, (@%s)"
+        % ",".join(str(channel.value) for channel in enabled_channels),
+    )
 
-    if (ch_1_curr is None) and (ch_2_curr is None) and (ch_3_curr is None):
+    return smu_handle
+
+
+@pytest.fixture(scope="session")
+def _smu_current_source_session(
+    pypm_options: SimpleNamespace,
+    smu_handle: Generator[KeysightU2723Wrapper, None, None],
+) -> Generator[Tuple[KeysightU2723Wrapper, List[SMUChannel]], None, None]:
+    """Set the source current and enable the configured SMU channels once per test session"""
+    src_levels = {
+        channel: float(value)
+        for channel, option in _SMU_I_INI
+        if (value := getattr(pypm_options, option))
+    }
+
+    if not src_levels:
         raise RuntimeError(
             "pytest options: 'smu_ch_1_source_current, smu_ch_2_source_current, smu_ch_3_source_current' are not defined"
         )
 
-    if ch_1_curr:
-        smu_handle.set_smu_source_current(SMUChannel.CH1, float(ch_1_curr))
-        smu_handle.enable_smu_channel(SMUChannel.CH1)
+    # turn off the channels enabled by the other source session, then set all channels and
+    # enable their outputs in one go
+    smu_handle.batch_write(_SMU_ALL_CHANNELS_OFF)
+    smu_handle.apply_source_currents(src_levels)
+    enabled_channels = list(src_levels)
+
+    # snapshot the configured state, so tests can restore it with a single command
+    smu_handle.save_state(SMU_CURRENT_SOURCE_STATE)
 
-    if ch_2_curr:
-        smu_handle.set_smu_source_current(SMUChannel.CH2, float(ch_2_curr))
-        smu_handle.enable_smu_channel(SMUChannel.CH2)
+    yield smu_handle, enabled_channels
 
-    if ch_3_curr:
-        smu_handle.set_smu_source_current(SMUChannel.CH3, float(ch_3_curr))
-        smu_handle.enable_smu_channel(SMUChannel.CH3)
+    # disable all channels in one go (presets are cleared when the session closes the instrument)
+    smu_handle.batch_write(_SMU_ALL_CHANNELS_OFF)
 
-    yield smu_handle
 
-    smu_handle.disable_smu_channel(SMUChannel.CH1)
-    smu_handle.disable_smu_channel(SMUChannel.CH2)
-    smu_handle.disable_smu_channel(SMUChannel.CH3)
-    smu_handle.clear_presets()
+@pytest.fixture
+def smu_current_source(
+    _smu_current_source_session: Tuple[KeysightU2723Wrapper, List[SMUChannel]],
+) -> KeysightU2723Wrapper:
+    """Restore the session source current configuration in case a previous test modified the instrument state"""
+    smu_handle, enabled_channels = _smu_current_source_session
+    smu_handle.batch_write(
+        "*RCL %s" % SMU_CURRENT_SOURCE_STATE,
+        _SMU_ALL_CHANNELS_OFF,
+        "OUTP 1, (@%s)"
+        % ",".join(str(channel.value) for channel in enabled_channels),
+    )
+
+    return smu_handle
@@ -0,0 +1,263 @@
+"""
+Utility functions shared by the Keysight instrument wrappers and the pytest plugin
+"""
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import tempfile
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pyvisa
+
+# Resources enumerated by the pytest-xdist workers of a test run are shared for this long (see list_resources_cached)
+VISA_RESOURCES_CACHE_TTL = 60.0  # seconds
+
+# A lock file whose owner cannot be checked is only broken after this long (see file_lock)
+LOCK_FILE_STALE_AGE = 600.0  # seconds
+
+# Resources listed by each resource manager of this process, by id (see list_resources_memoized)
+RESOURCE_CACHE_TTL = 5.0  # seconds
+_RESOURCE_CACHE: Dict[int, Tuple[float, Tuple[str, ...]]] = {}
+
+
+class ListableEnum(Enum):
+    """
+    Enumeration base class listing its members as 'ClassName.MEMBER' strings
+    """
+
+    @classmethod
+    def list(cls):
+        return list(cls._member_names())
+
+    @classmethod
+    @functools.cache
+    def _member_names(cls):
+        return tuple(f"{cls.__name__}.{member.name}" for member in cls)
+
+
+def parse_serial(resource_name: str) -> Optional[str]:
+    """
+    returns the serial number field of a USB VISA resource name
+    (e.g. USB0::0x0957::0x4D18::MY62390018::0::INSTR -> MY62390018)
+
+    None is returned for resources which do not carry a serial number (GPIB, ASRL, TCPIP, ...)
+    """
+    fields = resource_name.split("::")
+    if fields[0].startswith("USB") and len(fields) > 3:
+        return fields[3]
+    return None
+
+
+def index_resources_by_serial(
+    pyvisa_devices: Tuple[str, ...],
+) -> Dict[str, str]:
+    """maps the serial number of each detected USB instrument to its VISA resource name"""
+    return {
+        serial_no: device
+        for device in pyvisa_devices
+        if (serial_no := parse_serial(device))
+    }
+
+
+def find_serial_resources(
+    serial_no: str,
+    pyvisa_devices: Iterable[str],
+    serial_index: Optional[Dict[str, str]] = None,
+) -> Tuple[str, ...]:
+    """
+    returns the USB resources which may be the instrument with the given serial number (to be confirmed with *IDN?)
+
+    The resource found in the serial index (see index_resources_by_serial) is returned directly, otherwise
+    the serial number field of the USB resources is scanned (case insensitive, partial serial numbers match too)
+    """
+    if serial_index:
+        device = serial_index.get(serial_no)
+        if device is not None:
+            return (device,)
+
+    serial_no = serial_no.upper()
+    return tuple(
+        device
+        for device in pyvisa_devices
+        if serial_no in (parse_serial(device) or "").upper()
+    )
+
+
+def _scpi_separator(command: str) -> str:
+    """separator placed in front of a command joined to a compound program message"""
+    return ";" if command.startswith(("*", ":")) else ";:"
+
+
+def join_scpi_commands(commands: Iterable[str]) -> str:
+    """
+    joins SCPI commands into a single compound (semicolon separated) program message
+
+    Each subsystem command is prefixed with a colon to restart from the root of the command tree,
+    whereas common commands (e.g. *RST, *CLS) do not affect the command tree and are joined as they are
+    """
+    message = ""
+    for command in commands:
+        if not message:
+            message = command
+        else:
+            message += _scpi_separator(command) + command
+    return message
+
+
+def split_scpi_commands(
+    commands: Iterable[str], max_length: int
+) -> Iterator[str]:
+    """
+    joins SCPI commands into as few compound program messages as possible, each one fitting
+    the instrument input buffer (max_length characters). A longer command is sent on its own
+    """
+    message = ""
+    for command in commands:
+        if not message:
+            message = command
+        elif (
+            len(message) + len(_scpi_separator(command)) + len(command)
+            > max_length
+        ):
+            yield message
+            message = command
+        else:
+            message += _scpi_separator(command) + command
+
+    if message:
+        yield message
+
+
+def visa_run_files(run_id: str) -> Tuple[str, str]:
+    """
+    returns the lock file and the resources cache file shared by the processes of a test run
+    (run_id: e.g. the pytest-xdist testrunuid), concurrent test runs use separate files
+    """
+    prefix = os.path.join(tempfile.gettempdir(), f"pypm_visa_{run_id}")
+    return prefix + ".lock", prefix + "_resources.json"
+
+
+def _lock_file_stale(path: str) -> bool:
+    """whether the lock file was left behind by a process which exited without releasing it"""
+    with open(path) as lock:
+        owner = lock.read()
+
+    # the liveness check (signal 0) would interrupt the owner on Windows
+    if owner.isdigit() and os.name != "nt":
+        try:
+            os.kill(int(owner), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            # a running process of another user
+            return False
+        return False
+
+    # owner not written yet or not checkable, only break the lock once it is much older than any holder
+    return time.time() - os.path.getmtime(path) > LOCK_FILE_STALE_AGE
+
+
+@contextlib.contextmanager
+def file_lock(path: str, timeout: float = 30.0) -> Iterator[None]:
+    """
+    inter-process lock backed by the exclusive creation of a lock file holding the PID of its owner
+
+    A lock file whose owner is no longer running (or older than LOCK_FILE_STALE_AGE where the owner
+    cannot be checked) was left behind by a crashed process and is broken
+    """
+    pid = str(os.getpid())
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if _lock_file_stale(path):
+                    os.remove(path)
+                    continue
+            except OSError:
+                # lock released in the meantime
+                continue
+
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    "Timed out waiting for lock file: %s" % path
+                )
+            time.sleep(0.05)
+
+    try:
+        os.write(fd, pid.encode())
+    finally:
+        os.close(fd)
+
+    try:
+        yield
+    finally:
+        # only remove the lock file this process owns (it may have been broken and taken over meanwhile)
+        try:
+            with open(path) as lock:
+                owned = lock.read() == pid
+            if owned:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def list_resources_cached(
+    rm: "pyvisa.ResourceManager",
+    cache_file: str,
+    ttl: float = VISA_RESOURCES_CACHE_TTL,
+) -> Tuple[str, ...]:
+    """
+    returns the VISA resources detected by the resource manager, cached on disk for the TTL window
+
+    Processes starting within the window (e.g. pytest-xdist workers) skip the enumeration entirely.
+    Callers sharing the cache file must hold the lock file of the run (see visa_run_files)
+    """
+    try:
+        with open(cache_file) as cache:
+            cached = json.load(cache)
+        if time.time() - cached["timestamp"] < ttl:
+            return tuple(cached["devices"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    devices = tuple(rm.list_resources())
+    try:
+        with open(cache_file, "w") as cache:
+            json.dump({"timestamp": time.time(), "devices": devices}, cache)
+    except OSError as err:
+        # the other processes enumerate the resources themselves
+        logging.warning(
+            "Could not write the VISA resources cache %s: %s", cache_file, err
+        )
+    return devices
+
+
+def list_resources_memoized(
+    rm: "pyvisa.ResourceManager", ttl: float = RESOURCE_CACHE_TTL
+) -> Tuple[str, ...]:
+    """
+    returns the VISA resources detected by the resource manager, reusing an enumeration of the
+    same resource manager made within the TTL (e.g. by a previous context manager of the test session)
+    """
+    now = time.monotonic()
+    cached = _RESOURCE_CACHE.get(id(rm))
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+
+    devices = tuple(rm.list_resources())
+    _RESOURCE_CACHE[id(rm)] = (now, devices)
+    return devices
+
+
+def invalidate_resource_cache() -> None:
+    """forgets the memoized resource enumerations, e.g. after an instrument was (un)plugged"""
+    _RESOURCE_CACHE.clear()
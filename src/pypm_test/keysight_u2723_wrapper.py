@@ -11,10 +11,36 @@ The wrapper uses the PyVisa library to communicate with the instrument using VIS
 
 """
 
+import contextlib
 import logging
-import pyvisa
-from enum import Enum
-from typing import List, Tuple, Optional
+import math
+import queue
+import re
+import threading
+import time
+import numpy as np
+from .instrument_utils import (
+    ListableEnum,
+    find_serial_resources,
+    index_resources_by_serial,
+    join_scpi_commands,
+    list_resources_memoized,
+    split_scpi_commands,
+)
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Optional,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import pyvisa
 
 logger = logging.getLogger("Keyisght-U2723-Wrapper")
 logger.setLevel(logging.INFO)
@@ -26,57 +52,55 @@ MIN_VOLTAGE_LIMIT = -20  # V
 MAX_CURRENT_LIMIT = 0.12  # A
 MIN_CURRENT_LIMIT = -0.12  # A
 
+# the source limits are symmetric, the range checks compare magnitudes against the MAX limits
+
+# event status summary bit (ESB) of the IEEE 488.2 status byte
+STB_EVENT_SUMMARY_BIT = 0x20
+
+# longest program message sent in one write, kept well below the instrument input buffer
+MAX_MESSAGE_LENGTH = 4096  # characters
+
+# size of the U2723 error queue
+MAX_SYSTEM_ERRORS = 20
+
+# one <Number,"Error String"> entry of a SYST:ERR? response
+_SYSTEM_ERROR_RE = re.compile(r'[+-]?\d+,"[^"]*"')
+
 
 ### Enum Classes for source measure unit supported channels / power output / measure options ###
-class SMUChannel(Enum):
+class SMUChannel(ListableEnum):
     """
     Enumeration of U2723 SMU channels
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     CH1 = 1
     CH2 = 2
     CH3 = 3
 
 
-class SMUChannelMode(Enum):
+class SMUChannelMode(ListableEnum):
     """
     Enumeration of U2723 SMU channel modes
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     SVMI = 1  # Source Voltage , Measure Current
     SIMV = 2  # Source Current, Measure Voltage
 
 
-class SMUVoltageRange(Enum):
+class SMUVoltageRange(ListableEnum):
     """
     Enumeration of supported voltage ranges for Keyishgt U2723
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     R2V = "R2V"  # 2 V range
     R20V = "R20V"  # 20 V range
 
 
-class SMUCurrentRange(Enum):
+class SMUCurrentRange(ListableEnum):
     """
     Enumeration of supported current ranges for Keyishgt U2723
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     R1uA = "R1uA"  # 1 μA range
     R10uA = "R10uA"  # 10 μA range
     R100uA = "R100uA"  # 100 μA range
@@ -85,39 +109,155 @@ class SMUCurrentRange(Enum):
     R120mA = "R120mA"  # 120 mA range
 
 
-class SMUMemoryList(Enum):
+class SMUMemoryList(ListableEnum):
     """
     Enumeration of available buffer memories for Keyishgt U2723
     Each channel has two memory lists
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     Mem1 = 1
     Mem2 = 2
 
 
+### Enum members formatted once, SCPI commands look them up instead of reading .value ###
+_CH_STR = {channel: str(channel.value) for channel in SMUChannel}
+_VR_STR = {v_range: str(v_range.value) for v_range in SMUVoltageRange}
+_CR_STR = {c_range: str(c_range.value) for c_range in SMUCurrentRange}
+_MEM_STR = {mem_list: str(mem_list.value) for mem_list in SMUMemoryList}
+# SCPI channel list selecting a single channel, e.g. (@1)
+_CH_SEL = {channel: "(@%s)" % _CH_STR[channel] for channel in SMUChannel}
+
+
+### Per channel SCPI command templates (only the value is formatted per call) ###
+# source level commands are pre-encoded and sent with write_raw (hottest path in sweeps)
+_SOUR_CURR_PREFIX = b"SOUR:CURR:LEV:IMM:AMPL "
+_SOUR_VOLT_PREFIX = b"SOUR:VOLT:LEV:IMM:AMPL "
+_CH_SUFFIX = {
+    channel: b", %s" % _CH_SEL[channel].encode() for channel in SMUChannel
+}
+_VOLT_LIM_CMD = {
+    channel: "SOUR:VOLT:LIM %%s, %s" % _CH_SEL[channel]
+    for channel in SMUChannel
+}
+_CURR_LIM_CMD = {
+    channel: "SOUR:CURR:LIM %%s, %s" % _CH_SEL[channel]
+    for channel in SMUChannel
+}
+# the ranges are enums, their commands are complete for every (channel, range) combination
+_CURR_RANG_CMD = {
+    (
+        channel,
+        c_range,
+    ): f"SOUR:CURR:RANG {_CR_STR[c_range]}, {_CH_SEL[channel]}"
+    for channel in SMUChannel
+    for c_range in SMUCurrentRange
+}
+_VOLT_RANG_CMD = {
+    (
+        channel,
+        v_range,
+    ): f"SOUR:VOLT:RANG {_VR_STR[v_range]}, {_CH_SEL[channel]}"
+    for channel in SMUChannel
+    for v_range in SMUVoltageRange
+}
+_VOLT_TRIG_CMD = {
+    channel: "SOUR:VOLT:TRIG %%s, %s" % _CH_SEL[channel]
+    for channel in SMUChannel
+}
+_CURR_TRIG_CMD = {
+    channel: "SOUR:CURR:TRIG %%s, %s" % _CH_SEL[channel]
+    for channel in SMUChannel
+}
+
+
+def _group_channels(
+    channel_settings: Iterable[Tuple[SMUChannel, Hashable]],
+) -> Dict[Hashable, str]:
+    """groups the channels sharing the same setting, mapping each setting to its SCPI channel list (e.g. '1,3')"""
+    channels_by_setting: Dict[Hashable, List[str]] = {}
+    for channel, setting in channel_settings:
+        channels_by_setting.setdefault(setting, []).append(_CH_STR[channel])
+
+    return {
+        setting: ",".join(channels)
+        for setting, channels in channels_by_setting.items()
+    }
+
+
 ### Wrapper class implementing SCPI functions ###
 class KeysightU2723Wrapper:
-    """Wrapper class for utilitzing the SMU functions of Keysight U2723"""
+    """
+    Wrapper class for utilitzing the SMU functions of Keysight U2723
+
+    NOTE: commands are not synchronized with the instrument by default (no *WAI before each
+    write / query). Pass wait=True to write() / query() or call wait() explicitly where a
+    command must only run after all pending operations are complete
+
+    NOTE: with async_writes=True commands are sent by a background thread, queries wait for the
+    queued commands to be sent first (and raise any error of the background writes). Call flush()
+    to wait for their execution by the instrument
+    """
 
     def __init__(
         self,
         serial_no: str,
-        pyvisa_device_manager: pyvisa.ResourceManager,
+        pyvisa_device_manager: "pyvisa.ResourceManager",
         pyvisa_devices: Tuple[str, ...],
+        serial_index: Optional[Dict[str, str]] = None,
+        binary_transfer: bool = False,
+        chunk_size: int = 1 << 20,
+        async_writes: bool = False,
     ) -> None:
-        """Iniitalize Pyvisa interface and detect connected instruments"""
+        """
+        Iniitalize Pyvisa interface and detect connected instruments
+
+        Args:
+            serial_no (str): serial number of the instrument to connect to
+            pyvisa_device_manager (pyvisa.ResourceManager): Pyvisa resource manager
+            pyvisa_devices (Tuple[str, ...]): VISA resources detected by the resource manager
+            serial_index (Dict[str, str], optional): detected USB resources keyed by serial number (see index_resources_by_serial). Built from pyvisa_devices if not given.
+            binary_transfer (bool, optional): transfer array measurements / memory list results as binary REAL,64 blocks instead of ASCII. Defaults to False.
+            chunk_size (int, optional): VISA read chunk size in bytes, should exceed the largest array response. Defaults to 1 MB.
+            async_writes (bool, optional): queue commands to a background writer thread which coalesces them into compound messages. Defaults to False.
+        """
 
         self._device_manager = pyvisa_device_manager
-        pyvisa.log_to_screen(logging.INFO)
         self._device_url = ""
         self._serial_no = serial_no
         self._device_handle = None
         self._target_device_found = False
         self._detected_devices = pyvisa_devices
+        # detected USB resources keyed by serial number, open() looks the instrument up directly
+        self._serial_index = (
+            serial_index
+            if serial_index is not None
+            else index_resources_by_serial(pyvisa_devices)
+        )
+        self._chunk_size = chunk_size
+
+        # settings last written to each channel (source / trigger levels, limits, ranges, sweep),
+        # used to skip redundant writes
+        # NOTE: invalidated by any command that may change the channel state behind the setters
+        self._shadow = {channel: {} for channel in SMUChannel}
+
+        # background writer (see async_writes), started by open()
+        self._async_writes = async_writes
+        self._write_queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        # error raised by the background writer, re-raised by the next sync point
+        self._writer_error: Optional[Exception] = None
+
+        # setter commands held back by coalesce_writes(), keyed by (channel, setting)
+        self._pending: Optional[Dict[Tuple[SMUChannel, str], str]] = None
+
+        # termination appended to the pre-encoded commands sent with write_raw (set by open)
+        self._write_termination = b""
+
+        # data format commands, re-applied whenever the instrument is reset
+        self._binary_transfer = binary_transfer
+        self._data_format_commands = (
+            ("FORM:DATA REAL,64", "FORM:BORD SWAP") if binary_transfer else ()
+        )
 
         if not self._detected_devices:
             raise RuntimeError(
@@ -126,23 +266,37 @@ class KeysightU2723Wrapper:
 
     def open(self) -> None:
         """Opens the connection to a USB connected U2723"""
-        for device in self._detected_devices:
-            # Scan for USB devices
-            if device.find("USB") == 0 and self._serial_no in str(device):
-                self._device_url = device
-                self._device_handle = self._device_manager.open_resource(
-                    self._device_url
-                )
-                # set long timeout for U2723 (greater than 5 seconds) as recommended by user manual for array measurements
-                self._device_handle.timeout = 120e3  # (2 minutes)
-                device_info = self._device_handle.query("*IDN?")
-                # ckech it is a U2723 mode instrument
-                if "U2723" in str(device_info):
-                    logger.info(
-                        f"Opened connection to instrument: {device_info}"
-                    )
-                    self._target_device_found = True
-                    return None
+        # look up the device by serial number, fall back to scanning the detected USB devices
+        for device in find_serial_resources(
+            self._serial_no, self._detected_devices, self._serial_index
+        ):
+            self._device_url = device
+            self._device_handle = self._device_manager.open_resource(
+                self._device_url
+            )
+            # set long timeout for U2723 (greater than 5 seconds) as recommended by user manual for array measurements
+            self._device_handle.timeout = 120e3  # (2 minutes)
+            # read array responses in a single chunk instead of many small USB transfers
+            self._device_handle.chunk_size = self._chunk_size
+            # the U2723 terminates its responses with a line feed, configure it on the session once
+            # (also the termination character _query_small stops its bulk read at)
+            self._device_handle.read_termination = "\n"
+            self._device_handle.write_termination = "\n"
+            self._write_termination = b"\n"
+            device_info = self._device_handle.query("*IDN?")
+            # ckech it is a U2723 mode instrument
+            if "U2723" in str(device_info):
+                logger.info(f"Opened connection to instrument: {device_info}")
+                self._target_device_found = True
+                if self._async_writes:
+                    self._start_writer()
+                if self._data_format_commands:
+                    self.batch_write(*self._data_format_commands)
+                return None
+
+            # another instrument model carries the serial number
+            self._device_handle.close()
+            self._device_handle = None
 
         if not self._target_device_found:
             raise RuntimeError(
@@ -151,6 +305,7 @@ class KeysightU2723Wrapper:
 
     def close(self) -> None:
         """Closes the connection session to connected device"""
+        self._stop_writer()
         if self._device_handle:
             self._device_handle.close()
             logger.info(
@@ -159,36 +314,256 @@ class KeysightU2723Wrapper:
 
     def clear_presets(self) -> None:
         """clears preset status bit register of the connected instrument"""
-        self._device_handle.write("*rst; status:preset; *cls")
+        self.batch_write(
+            "*rst; status:preset; *cls", *self._data_format_commands
+        )
         logger.info("Cleared instrument presets")
 
     def clear_status(self) -> None:
         """clears all event status registers / error queue of the connected instrument"""
-        self._device_handle.write("*CLS")
+        self._write("*CLS")
         logger.info("Cleared all instrument event status registers / errors")
 
     def reset_defaults(self) -> None:
         """resets the instrument to its factory default state"""
-        self._device_handle.write("*RST")
+        self.batch_write("*RST", *self._data_format_commands)
         logger.info("U2723 reset to default factory state")
 
+    def _start_writer(self) -> None:
+        """starts the background thread draining the write queue"""
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._drain_writes,
+            name=f"U2723-writer-{self._serial_no}",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def _stop_writer(self) -> None:
+        """sends the queued commands and stops the background writer thread"""
+        if self._writer is None:
+            return
+
+        self._write_queue.put(None)
+        self._writer.join()
+        self._writer = None
+        self._write_queue = None
+
+    def _drain_writes(self) -> None:
+        """
+        background writer loop: coalesces the queued commands (up to 16 at a time) into
+        compound messages, a None item stops the loop
+        """
+        # the queue and the session are fixed for the lifetime of the writer, bind their
+        # methods once instead of looking them up for every command
+        get, get_nowait = self._write_queue.get, self._write_queue.get_nowait
+        task_done = self._write_queue.task_done
+        write = self._device_handle.write
+
+        while True:
+            commands = [get()]
+            while len(commands) < 16 and commands[-1] is not None:
+                try:
+                    commands.append(get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = commands[-1] is None
+            if stop:
+                commands.pop()
+
+            try:
+                for message in split_scpi_commands(
+                    commands, MAX_MESSAGE_LENGTH
+                ):
+                    write(message)
+            except Exception as err:
+                logger.exception("Background write failed: %s", commands)
+                self._writer_error = err
+            finally:
+                for _ in range(len(commands) + stop):
+                    task_done()
+
+            if stop:
+                return
+
+    def _sync_writes(self) -> None:
+        """
+        blocks until the background writer has sent all queued commands, a write which failed
+        in the background is reported here (the commands queued after it were still sent)
+        """
+        if self._pending:
+            self._send_pending()
+
+        if self._write_queue is None:
+            return
+
+        self._write_queue.join()
+        if self._writer_error is not None:
+            err, self._writer_error = self._writer_error, None
+            raise RuntimeError(
+                f"Background write to instrument failed: {err}"
+            ) from err
+
+    def _write(self, send_command: str) -> None:
+        """sends a command to the instrument, or queues it when the background writer is running"""
+        if self._pending:
+            # keep the command order, the held back setter commands were issued first
+            self._send_pending()
+
+        if self._write_queue is not None:
+            self._write_queue.put(send_command)
+        else:
+            self._device_handle.write(send_command)
+
+    def _query(self, query_command: str) -> str:
+        """queries the instrument once all queued commands were sent"""
+        self._sync_writes()
+        return self._device_handle.query(query_command)
+
+    def flush(self) -> None:
+        """
+        blocks until all queued commands were sent (see async_writes) and executed by the instrument
+        """
+        self._sync_writes()
+        self._query("*OPC?")
+
+    @contextlib.contextmanager
+    def coalesce_writes(self) -> Iterator[None]:
+        """
+        holds back the setter commands (source / trigger levels, limits, ranges, sweep settings) issued within the block,
+        only the last value set for each channel setting is sent when the block exits
+
+        NOTE: any other command or query issued within the block sends the held back commands first
+        """
+        if self._pending is not None:
+            # nested block, the outermost block sends the commands
+            yield
+            return
+
+        self._pending = {}
+        try:
+            yield
+        finally:
+            if self._pending:
+                self._send_pending()
+            self._pending = None
+
+    def _send_pending(self) -> None:
+        """sends the held back setter commands in the order their last value was set"""
+        commands = list(self._pending.values())
+        self._pending.clear()
+        for message in split_scpi_commands(commands, MAX_MESSAGE_LENGTH):
+            self._write(message)
+
+    def batch_write(self, *commands: str) -> None:
+        """
+        sends several SCPI commands to the instrument as a single compound (semicolon separated) message
+        NOTE: saves one bus transaction per command compared to writing the commands one by one,
+        long command sequences are split into messages of at most MAX_MESSAGE_LENGTH characters
+        """
+        self._invalidate_shadow()
+        for message in split_scpi_commands(commands, MAX_MESSAGE_LENGTH):
+            self._write(message)
+
+    def _invalidate_shadow(self) -> None:
+        """forgets the channel state mirrored by the setters"""
+        for channel_state in self._shadow.values():
+            channel_state.clear()
+
+    def _shadow_write(
+        self,
+        channel: SMUChannel,
+        key: str,
+        value,
+        send_command: Union[str, bytes],
+    ) -> None:
+        """
+        writes the command unless the channel already holds the value last written by the wrapper
+        (pre-encoded bytes commands are sent as they are, followed by the write termination)
+        """
+        channel_state = self._shadow[channel]
+        if key in channel_state and channel_state[key] == value:
+            return
+
+        if self._pending is not None:
+            # coalesce_writes(): replace the value set earlier within the block, moving the
+            # command behind the others (e.g. the last source level set selects the channel mode)
+            if isinstance(send_command, bytes):
+                send_command = send_command.decode("ascii")
+            self._pending.pop((channel, key), None)
+            self._pending[(channel, key)] = send_command
+        elif isinstance(send_command, bytes) and self._write_queue is None:
+            self._device_handle.write_raw(
+                send_command + self._write_termination
+            )
+        elif isinstance(send_command, bytes):
+            self._write(send_command.decode("ascii"))
+        else:
+            self._write(send_command)
+        channel_state[key] = value
+
+    def save_state(self, slot: int) -> None:
+        """
+        stores the current instrument state (output / measurement configuration) in the given
+        non-volatile storage location. The state can be restored later with recall_state()
+        """
+        self._write(f"*SAV {slot}")
+
+    def recall_state(self, slot: int) -> None:
+        """restores the instrument state previously stored by save_state() in the given storage location"""
+        self._invalidate_shadow()
+        self._write(f"*RCL {slot}")
+
     def wait(self) -> None:
         """
         configures the instrument's output buffer to wait until
         all pending operations are complete, before executing any subsequent commands or queries
         """
-        self._device_handle.write("*WAI")
+        self._write("*WAI")
 
     def is_operation_complete(self) -> bool:
         """
         returns true if the current operation is completed by the instrument (+1 is returned by query when operation is completed)
         NOTE: used to synchronize running application with the instrument
         """
-        completion_code_found = self._device_handle.query("*OPC?").find("1")
-        if completion_code_found == 0:
-            return True
-        else:
-            return False
+        # *OPC? replies exactly '1' (or '0'), compare its first character instead of searching it
+        return self._query_small("*OPC?")[:1] == "1"
+
+    def _query_small(self, query_command: str, n_bytes: int = 64) -> str:
+        """
+        queries a short, fixed format response (e.g. *OPC?, OUTP?) reading it with a single bulk
+        transfer of up to n_bytes instead of scanning the response for the termination character
+        """
+        self._sync_writes()
+        self._device_handle.write(query_command)
+        response = self._device_handle.read_bytes(
+            n_bytes, break_on_termchar=True
+        )
+        return response.decode("ascii").rstrip("\r\n")
+
+    def wait_operation_complete(self, timeout_ms: int = 60000) -> None:
+        """
+        blocks until all pending operations are completed by the instrument
+        NOTE: *OPC sets the event summary bit of the status byte once done, which is polled with
+        serial polls (read_stb) instead of repeating *OPC? query round trips. The event status enable
+        register is restored afterwards (the summary bit is read from the status byte, *SRE is not needed)
+        """
+        previous_ese = int(self._query("*ESE?"))
+        self._write("*ESE 1;*OPC")
+
+        self._sync_writes()
+        try:
+            deadline = time.monotonic() + timeout_ms / 1000
+            while not self._device_handle.read_stb() & STB_EVENT_SUMMARY_BIT:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(
+                        f"Instrument operation did not complete within {timeout_ms} ms"
+                    )
+                time.sleep(0.005)
+        finally:
+            # reading the event status register clears the OPC bit for the next wait
+            self._query(join_scpi_commands((f"*ESE {previous_ese}", "*ESR?")))
 
     def query_status_operation(self) -> int:
         """
@@ -221,7 +596,7 @@ class KeysightU2723Wrapper:
                 8 to 15 Not Used 0 0 is returned.
 
         """
-        response = self._device_handle.query("STAT:OPER:COND?")
+        response = self._query_small("STAT:OPER:COND?")
         return int(response)
 
     def query_system_errors(self) -> str:
@@ -232,9 +607,42 @@ class KeysightU2723Wrapper:
         For SCPI command errors, this command returns the following format string:
         <Number,"Error String">
         """
-        error_queue = self._device_handle.query("SYST:ERR?")
+        error_queue = self._query("SYST:ERR?")
         return str(error_queue)
 
+    def drain_system_errors(self, max_n: int = MAX_SYSTEM_ERRORS) -> List[str]:
+        """
+        reads and clears up to max_n errors from the instrument's error queue with a single
+        compound query (instead of one SYST:ERR? round trip per error)
+
+        Returns: the <Number,"Error String"> entries in the order they occurred (empty if no error)
+        """
+        response = self._query(join_scpi_commands(["SYST:ERR?"] * max_n))
+
+        errors = []
+        for entry in _SYSTEM_ERROR_RE.findall(response):
+            # the queue is empty once '+0,"No error"' is returned
+            if int(entry.split(",", 1)[0]) == 0:
+                break
+            errors.append(entry)
+        return errors
+
+    @staticmethod
+    def _check_source_current(src_current: float) -> None:
+        """raises a RuntimeError if the source current is outside the SMU limits"""
+        if math.fabs(src_current) > MAX_CURRENT_LIMIT:
+            raise RuntimeError(
+                f"Invalid value for source current. limits are: Min {MIN_CURRENT_LIMIT} A, Max {MAX_CURRENT_LIMIT} A"
+            )
+
+    @staticmethod
+    def _check_source_voltage(src_voltage: float) -> None:
+        """raises a RuntimeError if the source voltage is outside the SMU limits"""
+        if math.fabs(src_voltage) > MAX_VOLTAGE_LIMIT:
+            raise RuntimeError(
+                f"Invalid value for source voltage. limits are: Min {MIN_VOLTAGE_LIMIT} V, Max {MAX_VOLTAGE_LIMIT} V"
+            )
+
     def set_smu_source_current(
         self, channel: SMUChannel, src_current: float
     ) -> None:
@@ -247,13 +655,17 @@ class KeysightU2723Wrapper:
         the level for either a time varying or non-time varying signal.
 
         """
-        if src_current < MIN_CURRENT_LIMIT or src_current > MAX_CURRENT_LIMIT:
-            raise RuntimeError(
-                f"Invalid value for source current. limits are: Min {MIN_CURRENT_LIMIT} A, Max {MAX_CURRENT_LIMIT} A"
-            )
-
-        self._device_handle.write(
-            "SOUR:CURR:LEV:IMM:AMPL %s, (@%s)" % (src_current, channel.value)
+        self._check_source_current(src_current)
+
+        # the source level selects the channel priority mode, a voltage level has to be re-sent after it
+        self._shadow[channel].pop("v_src", None)
+        self._shadow_write(
+            channel,
+            "i_src",
+            src_current,
+            _SOUR_CURR_PREFIX
+            + str(src_current).encode()
+            + _CH_SUFFIX[channel],
         )
 
     def set_smu_source_voltage(
@@ -267,12 +679,16 @@ class KeysightU2723Wrapper:
         different value under the UNIT subsystem. The AMPLitude may be used to specify
         the level for either a time varying or non-time varying signal
         """
-        if src_voltage < MIN_VOLTAGE_LIMIT or src_voltage > MAX_VOLTAGE_LIMIT:
-            raise RuntimeError(
-                f"Invalid value for source current. limits are: Min {MIN_VOLTAGE_LIMIT} V, Max {MAX_VOLTAGE_LIMIT} V"
-            )
-        self._device_handle.write(
-            "SOUR:VOLT:LEV:IMM:AMPL %s, (@%s)" % (src_voltage, channel.value)
+        self._check_source_voltage(src_voltage)
+        # the source level selects the channel priority mode, a current level has to be re-sent after it
+        self._shadow[channel].pop("i_src", None)
+        self._shadow_write(
+            channel,
+            "v_src",
+            src_voltage,
+            _SOUR_VOLT_PREFIX
+            + str(src_voltage).encode()
+            + _CH_SUFFIX[channel],
         )
 
     def set_smu_voltage_limit(
@@ -283,8 +699,11 @@ class KeysightU2723Wrapper:
         voltage level will be clamped to the limit value if the voltage level has exceeded
         the bounds set
         """
-        self._device_handle.write(
-            "SOUR:VOLT:LIM %s, (@%s)" % (voltage_limit, channel.value)
+        self._shadow_write(
+            channel,
+            "v_lim",
+            voltage_limit,
+            _VOLT_LIM_CMD[channel] % voltage_limit,
         )
 
     def set_smu_current_limit(
@@ -295,8 +714,11 @@ class KeysightU2723Wrapper:
         current level will be clamped to the limit value if the current level has exceeded
         the bounds set
         """
-        self._device_handle.write(
-            "SOUR:CURR:LIM %s, (@%s)" % (current_limit, channel.value)
+        self._shadow_write(
+            channel,
+            "i_lim",
+            current_limit,
+            _CURR_LIM_CMD[channel] % current_limit,
         )
 
     def set_smu_current_range(
@@ -305,8 +727,11 @@ class KeysightU2723Wrapper:
         """
         This command sets the output current range. At *RST, low current range is selected.
         """
-        self._device_handle.write(
-            "SOUR:CURR:RANG %s, (@%s)" % (current_range.value, channel.value)
+        self._shadow_write(
+            channel,
+            "i_range",
+            current_range,
+            _CURR_RANG_CMD[channel, current_range],
         )
 
     def set_smu_voltage_range(
@@ -315,8 +740,11 @@ class KeysightU2723Wrapper:
         """
         This command sets the output voltage range. At *RST, low voltage range is selected
         """
-        self._device_handle.write(
-            "SOUR:VOLT:RANG %s, (@%s)" % (voltage_range.value, channel.value)
+        self._shadow_write(
+            channel,
+            "v_range",
+            voltage_range,
+            _VOLT_RANG_CMD[channel, voltage_range],
         )
 
     def set_smu_trigger_voltage(
@@ -327,8 +755,11 @@ class KeysightU2723Wrapper:
         are in voltage. The triggered level is a stored value that is transferred to the output
         when an output step is triggered.
         """
-        self._device_handle.write(
-            "SOUR:VOLT:TRIG %s, (@%s)" % (trigger_voltage, channel.value)
+        self._shadow_write(
+            channel,
+            "v_trig",
+            trigger_voltage,
+            _VOLT_TRIG_CMD[channel] % trigger_voltage,
         )
 
     def set_smu_trigger_current(
@@ -339,17 +770,184 @@ class KeysightU2723Wrapper:
         are in amperes. The triggered level is a stored value that is transferred to the
         output when an output step is triggered
         """
-        self._device_handle.write(
-            "SOUR:CURR:TRIG %s, (@%s)" % (trigger_current, channel.value)
+        self._shadow_write(
+            channel,
+            "i_trig",
+            trigger_current,
+            _CURR_TRIG_CMD[channel] % trigger_current,
         )
 
     def enable_smu_channel(self, channel: SMUChannel) -> None:
         """enables the output of given SMU channel"""
-        self._device_handle.write("OUTP 1, (@%s)" % channel.value)
+        self._write(f"OUTP 1, {_CH_SEL[channel]}")
 
     def disable_smu_channel(self, channel: SMUChannel) -> None:
         """disables the output of given SMU channel"""
-        self._device_handle.write("OUTP 0, (@%s)" % channel.value)
+        self._write(f"OUTP 0, {_CH_SEL[channel]}")
+
+    def apply_source_voltages(
+        self, src_voltages: Dict[SMUChannel, float]
+    ) -> None:
+        """
+        sets the source voltage of the given channels and enables their outputs in a single
+        compound message, channels sharing the same voltage are addressed with one channel list
+        """
+        for src_voltage in src_voltages.values():
+            self._check_source_voltage(src_voltage)
+
+        self._apply_source("SOUR:VOLT:LEV:IMM:AMPL", src_voltages)
+
+    def apply_source_currents(
+        self, src_currents: Dict[SMUChannel, float]
+    ) -> None:
+        """
+        sets the source current of the given channels and enables their outputs in a single
+        compound message, channels sharing the same current are addressed with one channel list
+        """
+        for src_current in src_currents.values():
+            self._check_source_current(src_current)
+
+        self._apply_source("SOUR:CURR:LEV:IMM:AMPL", src_currents)
+
+    def _apply_source(
+        self, level_command: str, src_levels: Dict[SMUChannel, float]
+    ) -> None:
+        """writes the source levels (grouped by value) followed by a single output enable"""
+        if not src_levels:
+            return
+
+        commands = [
+            f"{level_command} {src_level}, (@{channel_list})"
+            for src_level, channel_list in _group_channels(
+                src_levels.items()
+            ).items()
+        ]
+        channel_list = ",".join(_CH_STR[channel] for channel in src_levels)
+        commands.append(f"OUTP 1, (@{channel_list})")
+        self.batch_write(*commands)
+
+    ### Channel list setters: one command configures several channels (e.g. (@1,2,3)) ###
+    def _shadow_write_channels(
+        self,
+        channels: Iterable[SMUChannel],
+        key: str,
+        value,
+        command: str,
+    ) -> List[SMUChannel]:
+        """
+        writes '<command>, (@<channel list>)' once for all the channels which do not already hold
+        the value last written by the wrapper, returns the channels written to
+        """
+        targets = [
+            channel
+            for channel in channels
+            if key not in self._shadow[channel]
+            or self._shadow[channel][key] != value
+        ]
+        if not targets:
+            return targets
+
+        channel_list = ",".join(_CH_STR[channel] for channel in targets)
+        self._write(f"{command}, (@{channel_list})")
+        for channel in targets:
+            self._shadow[channel][key] = value
+        return targets
+
+    def set_smu_source_current_multi(
+        self, channels: Iterable[SMUChannel], src_current: float
+    ) -> None:
+        """sets the same source current on several channels (see set_smu_source_current)"""
+        self._check_source_current(src_current)
+        for channel in self._shadow_write_channels(
+            channels,
+            "i_src",
+            src_current,
+            f"SOUR:CURR:LEV:IMM:AMPL {src_current}",
+        ):
+            self._shadow[channel].pop("v_src", None)
+
+    def set_smu_source_voltage_multi(
+        self, channels: Iterable[SMUChannel], src_voltage: float
+    ) -> None:
+        """sets the same source voltage on several channels (see set_smu_source_voltage)"""
+        self._check_source_voltage(src_voltage)
+        for channel in self._shadow_write_channels(
+            channels,
+            "v_src",
+            src_voltage,
+            f"SOUR:VOLT:LEV:IMM:AMPL {src_voltage}",
+        ):
+            self._shadow[channel].pop("i_src", None)
+
+    def set_smu_voltage_limit_multi(
+        self, channels: Iterable[SMUChannel], voltage_limit: float
+    ) -> None:
+        """sets the same voltage limit on several channels (see set_smu_voltage_limit)"""
+        self._shadow_write_channels(
+            channels, "v_lim", voltage_limit, f"SOUR:VOLT:LIM {voltage_limit}"
+        )
+
+    def set_smu_current_limit_multi(
+        self, channels: Iterable[SMUChannel], current_limit: float
+    ) -> None:
+        """sets the same current limit on several channels (see set_smu_current_limit)"""
+        self._shadow_write_channels(
+            channels, "i_lim", current_limit, f"SOUR:CURR:LIM {current_limit}"
+        )
+
+    def set_smu_current_range_multi(
+        self, channels: Iterable[SMUChannel], current_range: SMUCurrentRange
+    ) -> None:
+        """sets the same output current range on several channels (see set_smu_current_range)"""
+        self._shadow_write_channels(
+            channels,
+            "i_range",
+            current_range,
+            f"SOUR:CURR:RANG {_CR_STR[current_range]}",
+        )
+
+    def set_smu_voltage_range_multi(
+        self, channels: Iterable[SMUChannel], voltage_range: SMUVoltageRange
+    ) -> None:
+        """sets the same output voltage range on several channels (see set_smu_voltage_range)"""
+        self._shadow_write_channels(
+            channels,
+            "v_range",
+            voltage_range,
+            f"SOUR:VOLT:RANG {_VR_STR[voltage_range]}",
+        )
+
+    def set_smu_trigger_voltage_multi(
+        self, channels: Iterable[SMUChannel], trigger_voltage: float
+    ) -> None:
+        """sets the same voltage trigger level on several channels (see set_smu_trigger_voltage)"""
+        self._shadow_write_channels(
+            channels,
+            "v_trig",
+            trigger_voltage,
+            f"SOUR:VOLT:TRIG {trigger_voltage}",
+        )
+
+    def set_smu_trigger_current_multi(
+        self, channels: Iterable[SMUChannel], trigger_current: float
+    ) -> None:
+        """sets the same current trigger level on several channels (see set_smu_trigger_current)"""
+        self._shadow_write_channels(
+            channels,
+            "i_trig",
+            trigger_current,
+            f"SOUR:CURR:TRIG {trigger_current}",
+        )
+
+    def enable_smu_channels(self, channels: Iterable[SMUChannel]) -> None:
+        """enables the outputs of several SMU channels with a single command"""
+        channel_list = ",".join(_CH_STR[channel] for channel in channels)
+        self._write(f"OUTP 1, (@{channel_list})")
+
+    def disable_smu_channels(self, channels: Iterable[SMUChannel]) -> None:
+        """disables the outputs of several SMU channels with a single command"""
+        channel_list = ",".join(_CH_STR[channel] for channel in channels)
+        self._write(f"OUTP 0, (@{channel_list})")
 
     def set_sweep_points(self, channel: SMUChannel, n_points: int) -> None:
         """
@@ -357,8 +955,11 @@ class KeysightU2723Wrapper:
         have measurement controls.
         Programmed values can range from 1 to 4096 (4K)
         """
-        self._device_handle.write(
-            "SENS:SWE:POIN %s, (@%s)" % (n_points, channel.value)
+        self._shadow_write(
+            channel,
+            "sweep_points",
+            n_points,
+            f"SENS:SWE:POIN {n_points}, {_CH_SEL[channel]}",
         )
         logger.info(
             f"SMU channel: {channel.name} sweep points set to: {n_points}"
@@ -372,8 +973,11 @@ class KeysightU2723Wrapper:
         models that have measurement controls. Programmed values can range from
         1 to 32767
         """
-        self._device_handle.write(
-            "SENS:SWE:TINT %s, (@%s)" % (interval_ms, channel.value)
+        self._shadow_write(
+            channel,
+            "sweep_interval",
+            interval_ms,
+            f"SENS:SWE:TINT {interval_ms}, {_CH_SEL[channel]}",
         )
         logger.info(
             f"SMU channel: {channel.name} sweep interval set to: {interval_ms} ms"
@@ -384,9 +988,7 @@ class KeysightU2723Wrapper:
         Query the sampling time for a single current measurement point. The
         parameter has a unit of seconds.
         """
-        curr_sample_sec = self._device_handle.query(
-            "SENS:CURR:APER? (@%s)" % channel.value
-        )
+        curr_sample_sec = self._query(f"SENS:CURR:APER? {_CH_SEL[channel]}")
         return float(curr_sample_sec)
 
     def query_voltage_sampling_time(self, channel: SMUChannel) -> float:
@@ -394,9 +996,7 @@ class KeysightU2723Wrapper:
         Query the sampling time for a single voltage measurement point. The
         parameter has a unit of seconds.
         """
-        volt_sample_sec = self._device_handle.query(
-            "SENS:VOLT:APER? (@%s)" % channel.value
-        )
+        volt_sample_sec = self._query(f"SENS:VOLT:APER? {_CH_SEL[channel]}")
         return float(volt_sample_sec)
 
     def measure_current_scalar(self, channel: SMUChannel) -> float:
@@ -410,9 +1010,7 @@ class KeysightU2723Wrapper:
         Returns:  a single current measurement (A)
         """
 
-        curr_meas = self._device_handle.query(
-            "MEAS:SCAL:CURR? (@%s)" % channel.value
-        )
+        curr_meas = self._query(f"MEAS:SCAL:CURR? {_CH_SEL[channel]}")
         return float(curr_meas)
 
     def measure_voltage_scalar(self, channel: SMUChannel) -> float:
@@ -425,12 +1023,10 @@ class KeysightU2723Wrapper:
 
         Returns:  a single voltage measurement (V)
         """
-        volt_meas = self._device_handle.query(
-            "MEAS:SCAL:VOLT? (@%s)" % channel.value
-        )
+        volt_meas = self._query(f"MEAS:SCAL:VOLT? {_CH_SEL[channel]}")
         return float(volt_meas)
 
-    def measure_voltage_array(self, channel: SMUChannel) -> List[float]:
+    def measure_voltage_array(self, channel: SMUChannel) -> np.ndarray:
         """
         This query initiates and triggers a measurement and returns an array containing
         the digitized output voltage in volts.
@@ -446,13 +1042,9 @@ class KeysightU2723Wrapper:
 
             Returns:  Array containg measured voltages (V)
         """
-        volt_meas_arr = self._device_handle.query(
-            "MEAS:ARR:VOLT? (@%s)" % channel.value
-        )
-
-        return [float(i) for i in volt_meas_arr.split(",")]
+        return self._query_array(f"MEAS:ARR:VOLT? {_CH_SEL[channel]}")
 
-    def measure_current_array(self, channel: SMUChannel) -> List[float]:
+    def measure_current_array(self, channel: SMUChannel) -> np.ndarray:
         """
         This query initiates and triggers a measurement and returns an array containing
         the digitized output current in amperes.
@@ -468,11 +1060,63 @@ class KeysightU2723Wrapper:
 
             Returns:  Array containg measured currents (A)
         """
-        curr_meas_arr = self._device_handle.query(
-            "MEAS:ARR:CURR? (@%s)" % channel.value
+        return self._query_array(f"MEAS:ARR:CURR? {_CH_SEL[channel]}")
+
+    def measure_voltage_array_stats(
+        self, channel: SMUChannel
+    ) -> Tuple[float, float, float, float]:
+        """
+        Measures a voltage array (see measure_voltage_array) and reduces it with numpy
+
+            Args:
+                - channel: SMU channle to use for measurement
+
+            Returns:  (mean, standard deviation, min, max) of the measured voltages (V)
+        """
+        return self._array_stats(self.measure_voltage_array(channel))
+
+    def measure_current_array_stats(
+        self, channel: SMUChannel
+    ) -> Tuple[float, float, float, float]:
+        """
+        Measures a current array (see measure_current_array) and reduces it with numpy
+
+            Args:
+                - channel: SMU channle to use for measurement
+
+            Returns:  (mean, standard deviation, min, max) of the measured currents (A)
+        """
+        return self._array_stats(self.measure_current_array(channel))
+
+    @staticmethod
+    def _array_stats(
+        measurements: np.ndarray,
+    ) -> Tuple[float, float, float, float]:
+        """returns the (mean, standard deviation, min, max) of an array measurement"""
+        return (
+            float(measurements.mean()),
+            float(measurements.std()),
+            float(measurements.min()),
+            float(measurements.max()),
         )
 
-        return [float(i) for i in curr_meas_arr.split(",")]
+    def _query_array(self, query_command: str) -> np.ndarray:
+        """queries an array measurement in the configured transfer format (binary or ASCII)"""
+        if self._binary_transfer:
+            self._sync_writes()
+            return self._device_handle.query_binary_values(
+                query_command,
+                datatype="d",
+                is_big_endian=False,
+                container=np.ndarray,
+            )
+
+        # parse the comma separated readings in C rather than float() per element
+        return np.fromstring(
+            self._query(query_command),
+            dtype=np.float64,
+            sep=",",
+        )
 
     def abort(self, channel: SMUChannel) -> None:
         """
@@ -480,20 +1124,27 @@ class KeysightU2723Wrapper:
         trigger state back to idle. It also resets the WTG transient bits in the Operation
         Condition Status register.
         """
-        self._device_handle.write("ABOR:TRAN (@%s)" % channel.value)
+        self._write(f"ABOR:TRAN {_CH_SEL[channel]}")
 
-    def query(self, query_command: str) -> str:
-        """send a generic query request (SCPI Syntax) to the instrument and return the result"""
-        # wait for ongoing queries / commands to complete first
-        self.wait()
-        response = self._device_handle.query(query_command)
+    def query(self, query_command: str, wait: bool = False) -> str:
+        """
+        send a generic query request (SCPI Syntax) to the instrument and return the result
+        (wait=True: wait for ongoing queries / commands to complete first)
+        """
+        if wait:
+            query_command = "*WAI;" + query_command
+        response = self._query(query_command)
         return str(response)
 
-    def write(self, send_command: str) -> None:
-        """send a generic SCPI command to the instrument"""
-        # wait for ongoing queries / commands to complete first
-        self.wait()
-        self._device_handle.write(send_command)
+    def write(self, send_command: str, wait: bool = False) -> None:
+        """
+        send a generic SCPI command to the instrument
+        (wait=True: wait for ongoing queries / commands to complete first)
+        """
+        if wait:
+            send_command = "*WAI;" + send_command
+        self._invalidate_shadow()
+        self._write(send_command)
 
     def enable_transient_trigger(self, channel: SMUChannel) -> None:
         """
@@ -502,9 +1153,11 @@ class KeysightU2723Wrapper:
         triggering action to occur. If the trigger system is not initiated, all triggers are
         ignored.
         """
-        self._device_handle.write("INIT:TRAN (@%s)" % channel.value)
+        # the transient trigger transfers the trigger levels to the output
+        self._shadow[channel].clear()
+        self._write(f"INIT:TRAN {_CH_SEL[channel]}")
 
-    def read_memory_list_results(self, channel: SMUChannel) -> List[float]:
+    def read_memory_list_results(self, channel: SMUChannel) -> np.ndarray:
         """
         This command reads the data result after executing the commands in the channel
         active memory list through a remote or hardware trigger action
@@ -514,23 +1167,34 @@ class KeysightU2723Wrapper:
         The reading is in the form of +9.99999999E+10 when output is set to OFF or no
         measurement is made during the memory list commands execution.
         Array values responses are separated by commas.
+        (transferred as a binary REAL,64 block instead when binary_transfer is enabled)
 
         """
-        results = self._device_handle.query(
-            "MEM:LIST:DATA? (@%s)" % channel.value
+        # the implicit *WAI was dropped from write() / query(), keep the barrier where it matters:
+        # the results are only read after the triggered memory list completed
+        query_command = f"*WAI;MEM:LIST:DATA? {_CH_SEL[channel]}"
+        if self._binary_transfer:
+            return self._query_array(query_command)
+
+        self._write(query_command)
+        self._sync_writes()
+        # decode the response straight from the VISA read buffer into an array
+        return self._device_handle.read_ascii_values(
+            converter="f", separator=",", container=np.ndarray
         )
-        return [float(i) for i in results.split(",")]
 
     def trigger_memory_list(self, channel: SMUChannel) -> None:
         """
         This command executes the active memory list commands for the specified
         channel
         """
-        self._device_handle.write("MEM:TRIG (@%s)" % channel.value)
+        # the memory list commands change the channel ranges / source levels
+        self._shadow[channel].clear()
+        self._write(f"MEM:TRIG {_CH_SEL[channel]}")
 
     def query_smu_output_status(self, channel: SMUChannel) -> int:
         """returns the output status for SMU channel (1: Output enabled, 0: Standby mode)"""
-        status = self._device_handle.query("OUTP? (@%s)" % channel.value)
+        status = self._query_small(f"OUTP? {_CH_SEL[channel]}")
         return int(status)
 
     def calibrate(self) -> int:
@@ -538,7 +1202,7 @@ class KeysightU2723Wrapper:
         This command performs a self-calibration of the instrument and returns a pass/
         fail indication.
         """
-        cal_return_code = self._device_handle.query("CAL?")
+        cal_return_code = self._query_small("CAL?")
         return int(cal_return_code)
 
 
@@ -550,7 +1214,7 @@ class KeysightU2723SourceMeasureUnit:
 
     def __init__(
         self,
-        pyvisa_manager: pyvisa.ResourceManager,
+        pyvisa_manager: "pyvisa.ResourceManager",
         serial_no: str,
         smu_channel_1_output_mode: Optional[SMUChannelMode] = None,
         smu_channel_1_output_value: Optional[float] = None,
@@ -567,7 +1231,7 @@ class KeysightU2723SourceMeasureUnit:
     ):
         self.pyvisa_manager = pyvisa_manager
         self.serial_no = serial_no
-        self.pyvisa_devices = self.pyvisa_manager.list_resources()
+        self.pyvisa_devices = list_resources_memoized(self.pyvisa_manager)
         self.keysgiht_u2723 = KeysightU2723Wrapper(
             serial_no, self.pyvisa_manager, self.pyvisa_devices
         )
@@ -584,86 +1248,98 @@ class KeysightU2723SourceMeasureUnit:
         self.smu_channel_3_voltage_range = smu_channel_3_voltage_range
         self.smu_channel_3_current_range = smu_channel_3_current_range
 
-    def __enter__(self):
-        self.keysgiht_u2723.open()
-        # CH1
-        if (self.smu_channel_1_voltage_range is not None) and (
-            self.smu_channel_1_current_range is not None
-        ):
-            self.keysgiht_u2723.set_smu_voltage_range(
-                SMUChannel.CH1, self.smu_channel_1_voltage_range
-            )
-            self.keysgiht_u2723.set_smu_current_range(
-                SMUChannel.CH1, self.smu_channel_1_current_range
-            )
+        # the channel configuration is fixed for the lifetime of the context manager, build
+        # its setup commands once instead of on every 'with' block entry
+        self._setup_commands = self._build_setup_commands()
 
-        if (self.smu_channel_1_output_mode == SMUChannelMode.SVMI) and (
-            self.smu_channel_1_output_value is not None
-        ):
-            self.keysgiht_u2723.set_smu_source_voltage(
-                SMUChannel.CH1, self.smu_channel_1_output_value
-            )
+    def _build_setup_commands(self) -> Tuple[str, ...]:
+        """
+        validates the channel configuration and builds the commands applying it, channels sharing
+        the same ranges / source level are addressed with one channel list
+        """
+        channels_setup = (
+            (
+                SMUChannel.CH1,
+                self.smu_channel_1_output_mode,
+                self.smu_channel_1_output_value,
+                self.smu_channel_1_voltage_range,
+                self.smu_channel_1_current_range,
+            ),
+            (
+                SMUChannel.CH2,
+                self.smu_channel_2_output_mode,
+                self.smu_channel_2_output_value,
+                self.smu_channel_2_voltage_range,
+                self.smu_channel_2_current_range,
+            ),
+            (
+                SMUChannel.CH3,
+                self.smu_channel_3_output_mode,
+                self.smu_channel_3_output_value,
+                self.smu_channel_3_voltage_range,
+                self.smu_channel_3_current_range,
+            ),
+        )
 
-        if (self.smu_channel_1_output_mode == SMUChannelMode.SIMV) and (
-            self.smu_channel_1_output_value is not None
-        ):
-            self.keysgiht_u2723.set_smu_source_current(
-                SMUChannel.CH1, self.smu_channel_1_output_value
+        ranges = []
+        src_voltages = []
+        src_currents = []
+        for (
+            channel,
+            output_mode,
+            output_value,
+            voltage_range,
+            current_range,
+        ) in channels_setup:
+            if (voltage_range is not None) and (current_range is not None):
+                ranges.append((channel, (voltage_range, current_range)))
+
+            if output_value is None:
+                continue
+
+            if output_mode == SMUChannelMode.SVMI:
+                self.keysgiht_u2723._check_source_voltage(output_value)
+                src_voltages.append((channel, output_value))
+
+            if output_mode == SMUChannelMode.SIMV:
+                self.keysgiht_u2723._check_source_current(output_value)
+                src_currents.append((channel, output_value))
+
+        commands = []
+        for (voltage_range, current_range), channel_list in _group_channels(
+            ranges
+        ).items():
+            commands.append(
+                f"SOUR:VOLT:RANG {_VR_STR[voltage_range]}, (@{channel_list})"
             )
-        # CH2
-        if (self.smu_channel_2_voltage_range is not None) and (
-            self.smu_channel_2_current_range is not None
-        ):
-            self.keysgiht_u2723.set_smu_voltage_range(
-                SMUChannel.CH2, self.smu_channel_2_voltage_range
-            )
-            self.keysgiht_u2723.set_smu_current_range(
-                SMUChannel.CH2, self.smu_channel_2_current_range
+            commands.append(
+                f"SOUR:CURR:RANG {_CR_STR[current_range]}, (@{channel_list})"
             )
 
-        if (self.smu_channel_2_output_mode == SMUChannelMode.SVMI) and (
-            self.smu_channel_2_output_value is not None
-        ):
-            self.keysgiht_u2723.set_smu_source_voltage(
-                SMUChannel.CH2, self.smu_channel_2_output_value
+        for src_voltage, channel_list in _group_channels(src_voltages).items():
+            commands.append(
+                f"SOUR:VOLT:LEV:IMM:AMPL {src_voltage}, (@{channel_list})"
             )
 
-        if (self.smu_channel_2_output_mode == SMUChannelMode.SIMV) and (
-            self.smu_channel_2_output_value is not None
-        ):
-            self.keysgiht_u2723.set_smu_source_current(
-                SMUChannel.CH2, self.smu_channel_2_output_value
-            )
-        # CH3
-        if (self.smu_channel_3_voltage_range is not None) and (
-            self.smu_channel_3_current_range is not None
-        ):
-            self.keysgiht_u2723.set_smu_voltage_range(
-                SMUChannel.CH3, self.smu_channel_3_voltage_range
-            )
-            self.keysgiht_u2723.set_smu_current_range(
-                SMUChannel.CH3, self.smu_channel_3_current_range
+        for src_current, channel_list in _group_channels(src_currents).items():
+            commands.append(
+                f"SOUR:CURR:LEV:IMM:AMPL {src_current}, (@{channel_list})"
             )
 
-        if (self.smu_channel_3_output_mode == SMUChannelMode.SVMI) and (
-            self.smu_channel_3_output_value is not None
-        ):
-            self.keysgiht_u2723.set_smu_source_voltage(
-                SMUChannel.CH3, self.smu_channel_3_output_value
-            )
+        return tuple(commands)
 
-        if (self.smu_channel_3_output_mode == SMUChannelMode.SIMV) and (
-            self.smu_channel_3_output_value is not None
-        ):
-            self.keysgiht_u2723.set_smu_source_current(
-                SMUChannel.CH3, self.smu_channel_3_output_value
-            )
+    def __enter__(self):
+        self.keysgiht_u2723.open()
+
+        # configure all channels with a single compound message
+        if self._setup_commands:
+            self.keysgiht_u2723.batch_write(*self._setup_commands)
 
         return self.keysgiht_u2723
 
     def __exit__(self, exc_type, exc_value, traceback):
+        # the *cls in the preset sequence also clears the status
         self.keysgiht_u2723.clear_presets()
-        self.keysgiht_u2723.clear_status()
         self.keysgiht_u2723.close()
 
 
@@ -692,36 +1368,39 @@ def smu_source_voltage_measure_current(
         measure_count (int, optional): number of current measurements to perform. Defaults to 1.
     """
 
+    # build the memory list program, it is sent to the instrument as a single compound message
+    channel_sel = _CH_SEL[channel]
+    commands = []
+
     # select memory list and clear existing commands
-    smu.write("MEM:LIST %s, (@%s)" % (memory_list.value, channel.value))
-    smu.write("MEM:LIST:CLEAR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST {_MEM_STR[memory_list]}, {channel_sel}")
+    commands.append(f"MEM:LIST:CLEAR {channel_sel}")
 
     # set voltage ,crurent ranges and current limit for the channel
-    smu.write("MEM:VOLT:RANG %s, (@%s)" % (voltage_range.value, channel.value))
-    smu.write("MEM:CURR:RANG %s, (@%s)" % (current_range.value, channel.value))
-    smu.write("MEM:CURR:LIM %s, (@%s)" % (current_limit, channel.value))
+    commands.append(f"MEM:VOLT:RANG {_VR_STR[voltage_range]}, {channel_sel}")
+    commands.append(f"MEM:CURR:RANG {_CR_STR[current_range]}, {channel_sel}")
+    commands.append(f"MEM:CURR:LIM {current_limit}, {channel_sel}")
     # enable auto delay between source commands
-    smu.write("MEM:SOUR:DEL:AUTO ON, (@%s)" % (channel.value))
+    commands.append(f"MEM:SOUR:DEL:AUTO ON, {channel_sel}")
     # source voltage, enable output
-    smu.write("MEM:VOLT:SOUR %s, (@%s)" % (V_out, channel.value))
-    smu.write("MEM:OUTP ON, (@%s)" % (channel.value))
+    commands.append(f"MEM:VOLT:SOUR {V_out}, {channel_sel}")
+    commands.append(f"MEM:OUTP ON, {channel_sel}")
 
     # add local delay before measure if desired
     if measure_delay_ms:
-        smu.write(
-            "MEM:SOUR:DEL SING,%s,(@%s)" % (measure_delay_ms, channel.value)
-        )
-        smu.write("MEM:VOLT:SOUR %s, (@%s)" % (V_out, channel.value))
+        commands.append(f"MEM:SOUR:DEL SING,{measure_delay_ms},{channel_sel}")
+        commands.append(f"MEM:VOLT:SOUR {V_out}, {channel_sel}")
 
     # make current measurements
-    for _ in range(measure_count):
-        smu.write("MEM:CURR:MEAS (@%s)" % (channel.value))
+    commands.extend([f"MEM:CURR:MEAS {channel_sel}"] * measure_count)
 
     # switch off output at the end of measurement
-    smu.write("MEM:OUTP OFF, (@%s)" % (channel.value))
+    commands.append(f"MEM:OUTP OFF, {channel_sel}")
 
     # stores all commands from the active memory list into the nonvolatile memory
-    smu.write("MEM:LIST:STOR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST:STOR {channel_sel}")
+
+    smu.batch_write(*commands)
 
 
 def smu_source_current_measure_voltage(
@@ -748,36 +1427,39 @@ def smu_source_current_measure_voltage(
         measure_count (int, optional): number of voltage measurements to perform. Defaults to 1.
     """
 
+    # build the memory list program, it is sent to the instrument as a single compound message
+    channel_sel = _CH_SEL[channel]
+    commands = []
+
     # select memory list and clear existing commands
-    smu.write("MEM:LIST %s, (@%s)" % (memory_list.value, channel.value))
-    smu.write("MEM:LIST:CLEAR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST {_MEM_STR[memory_list]}, {channel_sel}")
+    commands.append(f"MEM:LIST:CLEAR {channel_sel}")
 
     # set voltage ,crurent ranges and voltage limit for the channel
-    smu.write("MEM:VOLT:RANG %s, (@%s)" % (voltage_range.value, channel.value))
-    smu.write("MEM:CURR:RANG %s, (@%s)" % (current_range.value, channel.value))
-    smu.write("MEM:VOLT:LIM %s, (@%s)" % (voltage_limit, channel.value))
+    commands.append(f"MEM:VOLT:RANG {_VR_STR[voltage_range]}, {channel_sel}")
+    commands.append(f"MEM:CURR:RANG {_CR_STR[current_range]}, {channel_sel}")
+    commands.append(f"MEM:VOLT:LIM {voltage_limit}, {channel_sel}")
     # enable auto delay
-    smu.write("MEM:SOUR:DEL:AUTO ON, (@%s)" % (channel.value))
+    commands.append(f"MEM:SOUR:DEL:AUTO ON, {channel_sel}")
     # source voltage, enable output
-    smu.write("MEM:CURR:SOUR %s, (@%s)" % (I_out, channel.value))
-    smu.write("MEM:OUTP ON, (@%s)" % (channel.value))
+    commands.append(f"MEM:CURR:SOUR {I_out}, {channel_sel}")
+    commands.append(f"MEM:OUTP ON, {channel_sel}")
 
     # add local delay before measure if desired
     if measure_delay_ms:
-        smu.write(
-            "MEM:SOUR:DEL SING,%s,(@%s)" % (measure_delay_ms, channel.value)
-        )
-        smu.write("MEM:CURR:SOUR %s, (@%s)" % (I_out, channel.value))
+        commands.append(f"MEM:SOUR:DEL SING,{measure_delay_ms},{channel_sel}")
+        commands.append(f"MEM:CURR:SOUR {I_out}, {channel_sel}")
 
     # make voltage measurements
-    for _ in range(measure_count):
-        smu.write("MEM:VOLT:MEAS (@%s)" % (channel.value))
+    commands.extend([f"MEM:VOLT:MEAS {channel_sel}"] * measure_count)
 
     # switch off output at the end of measurement
-    smu.write("MEM:OUTP OFF, (@%s)" % (channel.value))
+    commands.append(f"MEM:OUTP OFF, {channel_sel}")
 
     # stores all commands from the active memory list into the nonvolatile memory
-    smu.write("MEM:LIST:STOR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST:STOR {channel_sel}")
+
+    smu.batch_write(*commands)
 
 
 def create_smu_pulse_current(
@@ -805,27 +1487,33 @@ def create_smu_pulse_current(
         memory_list (SMUMemoryList, optional): memory list to use Defaults to SMUMemoryList.Mem1.
         loops (int, optional): number of times to repeat the pulse loading. Defaults to 1.
     """
+    # build the memory list program, it is sent to the instrument as a single compound message
+    channel_sel = _CH_SEL[channel]
+    commands = []
+
     # select memory list and clear existing commands
-    smu.write("MEM:LIST %s, (@%s)" % (memory_list.value, channel.value))
-    smu.write("MEM:LIST:CLEAR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST {_MEM_STR[memory_list]}, {channel_sel}")
+    commands.append(f"MEM:LIST:CLEAR {channel_sel}")
 
     # set voltage , current ranges and voltage, current limits for the channel
-    smu.write("MEM:VOLT:RANG %s, (@%s)" % (voltage_range.value, channel.value))
-    smu.write("MEM:CURR:RANG %s, (@%s)" % (current_range.value, channel.value))
-    smu.write("MEM:VOLT:LIM %s, (@%s)" % (voltage_limit, channel.value))
-    smu.write("MEM:CURR:LIM %s, (@%s)" % (current_limit, channel.value))
+    commands.append(f"MEM:VOLT:RANG {_VR_STR[voltage_range]}, {channel_sel}")
+    commands.append(f"MEM:CURR:RANG {_CR_STR[current_range]}, {channel_sel}")
+    commands.append(f"MEM:VOLT:LIM {voltage_limit}, {channel_sel}")
+    commands.append(f"MEM:CURR:LIM {current_limit}, {channel_sel}")
     # enable auto delay to allow for stable signal
-    smu.write("MEM:SOUR:DEL:AUTO ON, (@%s)" % (channel.value))
+    commands.append(f"MEM:SOUR:DEL:AUTO ON, {channel_sel}")
     # create the pulse signal steps
-    smu.write("MEM:SOUR:DEL SING,%s,(@%s)" % (pulse_width_ms, channel.value))
-    smu.write("MEM:CURR:SOUR %s, (@%s)" % (I_peak, channel.value))
-    smu.write("MEM:CURR:SOUR %s, (@%s)" % (0.0, channel.value))
+    commands.append(f"MEM:SOUR:DEL SING,{pulse_width_ms},{channel_sel}")
+    commands.append(f"MEM:CURR:SOUR {I_peak}, {channel_sel}")
+    commands.append(f"MEM:CURR:SOUR 0.0, {channel_sel}")
 
     # configure start step, end step, loops count
-    smu.write("MEM:CONF:POIN %s,%s,%s,(@%s)" % (1, 8, loops, channel.value))
+    commands.append(f"MEM:CONF:POIN 1,8,{loops},{channel_sel}")
 
     # stores all commands from the active memory list into the nonvolatile memory
-    smu.write("MEM:LIST:STOR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST:STOR {channel_sel}")
+
+    smu.batch_write(*commands)
 
 
 def create_smu_pulse_voltage(
@@ -854,24 +1542,30 @@ def create_smu_pulse_voltage(
 
     """
 
+    # build the memory list program, it is sent to the instrument as a single compound message
+    channel_sel = _CH_SEL[channel]
+    commands = []
+
     # select memory list and clear existing commands
-    smu.write("MEM:LIST %s, (@%s)" % (memory_list.value, channel.value))
-    smu.write("MEM:LIST:CLEAR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST {_MEM_STR[memory_list]}, {channel_sel}")
+    commands.append(f"MEM:LIST:CLEAR {channel_sel}")
 
     # set voltage , current ranges and voltage, current limits for the channel
-    smu.write("MEM:VOLT:RANG %s, (@%s)" % (voltage_range.value, channel.value))
-    smu.write("MEM:CURR:RANG %s, (@%s)" % (current_range.value, channel.value))
-    smu.write("MEM:VOLT:LIM %s, (@%s)" % (voltage_limit, channel.value))
-    smu.write("MEM:CURR:LIM %s, (@%s)" % (current_limit, channel.value))
+    commands.append(f"MEM:VOLT:RANG {_VR_STR[voltage_range]}, {channel_sel}")
+    commands.append(f"MEM:CURR:RANG {_CR_STR[current_range]}, {channel_sel}")
+    commands.append(f"MEM:VOLT:LIM {voltage_limit}, {channel_sel}")
+    commands.append(f"MEM:CURR:LIM {current_limit}, {channel_sel}")
     # enable auto delay to allow for stable signal
-    smu.write("MEM:SOUR:DEL:AUTO ON, (@%s)" % (channel.value))
+    commands.append(f"MEM:SOUR:DEL:AUTO ON, {channel_sel}")
     # create the pulse signal steps
-    smu.write("MEM:SOUR:DEL SING,%s,(@%s)" % (pulse_width_ms, channel.value))
-    smu.write("MEM:VOLT:SOUR %s, (@%s)" % (V_peak, channel.value))
-    smu.write("MEM:VOLT:SOUR %s, (@%s)" % (0.0, channel.value))
+    commands.append(f"MEM:SOUR:DEL SING,{pulse_width_ms},{channel_sel}")
+    commands.append(f"MEM:VOLT:SOUR {V_peak}, {channel_sel}")
+    commands.append(f"MEM:VOLT:SOUR 0.0, {channel_sel}")
 
     # configure start step, end step, loops count
-    smu.write("MEM:CONF:POIN %s,%s,%s,(@%s)" % (1, 8, loops, channel.value))
+    commands.append(f"MEM:CONF:POIN 1,8,{loops},{channel_sel}")
 
     # stores all commands from the active memory list into the nonvolatile memory
-    smu.write("MEM:LIST:STOR (@%s)" % (channel.value))
+    commands.append(f"MEM:LIST:STOR {channel_sel}")
+
+    smu.batch_write(*commands)
@@ -8,10 +8,33 @@ The wrapper uses the PyVisa library to communicate with the instrument using VIS
 
 """
 
+import asyncio
+import contextlib
 import logging
-import pyvisa
-from enum import Enum
-from typing import Union, Tuple, Optional
+import threading
+import time
+import numpy as np
+from .instrument_utils import (
+    ListableEnum,
+    find_serial_resources,
+    join_scpi_commands,
+    list_resources_memoized,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Union,
+    Tuple,
+    Optional,
+)
+
+if TYPE_CHECKING:
+    import pyvisa
 
 logger = logging.getLogger("Keyisght-U3606-Wrapper")
 logger.setLevel(logging.INFO)
@@ -20,113 +43,88 @@ logger.setLevel(logging.INFO)
 MAX_VOLTAGE_LIMIT = 30  # V
 MAX_CURRENT_LIMIT = 1.05  # A
 
+# LOG:DATA? queries chained into a single message by read_all_logged_data
+LOG_DATA_QUERIES_PER_MESSAGE = 50
+
+# Configuration query responses are reused for this long, unless the wrapper writes to the instrument
+# (kept short, the front panel may change the configuration behind the wrapper)
+CONFIG_CACHE_TTL = 0.05  # seconds
+
 
 ### Enum Classes for power supply supported power output / measure options ###
-class DCOutputMode(Enum):
+class DCOutputMode(ListableEnum):
     """
     Enumeration to configure output mode for the DC Supply of Keyishgt U3606 (constant voltage or constant current)
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     CONSTANT_VOLTAGE = "VOLT"
     CONSTANT_CURRENT = "CURR"
 
 
-class DCOutputVoltageRange(Enum):
+class DCOutputVoltageRange(ListableEnum):
     """
     Enumeration to configure output voltage range for the DC Supply of Keyishgt U3606 (constant voltage or constant current)
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     MAX = "MAX"  # 30 V (default)
     MIN = "MIN"  # 1 V
     AUTO = "AUTO"
 
 
-class DCOutputCurrentRange(Enum):
+class DCOutputCurrentRange(ListableEnum):
     """
     Enumeration to configure output curremt range for the DC Supply of Keyishgt U3606 (constant voltage or constant current)
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     MAX = "MAX"  # 3 A
     DEFAULT = "DEF"  # 1 A
     MIN = "MIN"  # 100 mA
     AUTO = "AUTO"
 
 
-class MultimeterMode(Enum):
+class MultimeterMode(ListableEnum):
     """
     Enumeration to configure measurement mode for the Multimeter instrument of Keyishgt U3606
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     VOLTAGE = "VOLT"
     CURRENT = "CURR"
     RESISTANCE = "RES"
 
 
-class MultimeterRange(Enum):
+class MultimeterRange(ListableEnum):
     """
     Enumeration to configure range option for the Multimeter instrument of Keyishgt U3606
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     AUTO = "AUTO"
     MAX = "MAX"
     MIN = "MIN"
 
 
-class MultimeterResolution(Enum):
+class MultimeterResolution(ListableEnum):
     """
     Enumeration to configure the resolution option for the Multimeter instrument of Keyishgt U3606
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     MAX = "MAX"  # 4 and 1/2 digits
     MIN = "MIN"  # 5 and 1/2 digits (default)
 
 
-class SignalType(Enum):
+class SignalType(ListableEnum):
     """
     Enumeration to configure the signal type for the Multimeter instrument of Keyishgt U3606
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     AC = "AC"
     DC = "DC"
 
 
-class CalcFunction(Enum):
+class CalcFunction(ListableEnum):
     """
     Enumeration for the caclulation functions of U3606
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     AVERAGE = "AVER"  # mathematical average (mean) of all readings taken since averaging was enabled
     DB = "DB"  # computes the dBm value for the next reading based on reference resistance
     DBM = (
@@ -137,15 +135,11 @@ class CalcFunction(Enum):
     NULL = "NULL"  # Result = Reading – Offset
 
 
-class QuestionRegister(Enum):
+class QuestionRegister(ListableEnum):
     """
     Enumeration for the condition registers (decimal values) of U3606
     """
 
-    @classmethod
-    def list(cls):
-        return list(map(lambda c: cls.__name__ + "." + c.name, cls))
-
     VOLT_OVERLOAD = "1"
     CURR_OVERLOAD = "2"
     RES_OVERLOAD = "512"
@@ -155,24 +149,164 @@ class QuestionRegister(Enum):
     LOW_LIM_FAILED = "2048"
 
 
+### Setter commands formatted once per enum member ###
+_QUES_ENAB_CMD = {
+    question_register: f"STAT:QUES:ENAB {question_register.value}"
+    for question_register in QuestionRegister
+}
+_CALC_FUNC_CMD = {
+    calc_func: f"CALC:FUNC {calc_func.value}" for calc_func in CalcFunction
+}
+
+
+### Multimeter commands formatted once for every combination of the multimeter options ###
+# the signal type does not apply to resistance measurements
+_CONF_CMD = {
+    (mode, m_range, resolution, signal): (
+        f"CONF:{mode.value} {m_range.value}, {resolution.value}"
+        if mode is MultimeterMode.RESISTANCE
+        else f"CONF:{mode.value}:{signal.value} {m_range.value}, {resolution.value}"
+    )
+    for mode in MultimeterMode
+    for m_range in MultimeterRange
+    for resolution in MultimeterResolution
+    for signal in SignalType
+}
+
+_MEASURE_CMD = {
+    (mode, m_range, resolution, signal): (
+        f"MEAS:{mode.value}? {m_range.value}, {resolution.value}"
+        if mode is MultimeterMode.RESISTANCE
+        else f"MEAS:{mode.value}:{signal.value}? {m_range.value}, {resolution.value}"
+    )
+    for mode in MultimeterMode
+    for m_range in MultimeterRange
+    for resolution in MultimeterResolution
+    for signal in SignalType
+}
+
+
+def _multimeter_command(
+    commands: Dict[tuple, str],
+    measure_mode: MultimeterMode,
+    measure_range: MultimeterRange,
+    measure_resolution: MultimeterResolution,
+    signal_type: SignalType,
+) -> str:
+    """
+    returns the command (_CONF_CMD / _MEASURE_CMD) for the multimeter options
+    NOTE: the tables only hold valid option combinations, the lookup also checks the argument types
+    """
+    try:
+        return commands[
+            measure_mode, measure_range, measure_resolution, signal_type
+        ]
+    except (KeyError, TypeError):
+        raise RuntimeError(
+            f"Invalid measurement options: {measure_mode}, {measure_range}, {measure_resolution}, {signal_type}. options need to be valid enums of type: MultimeterMode, MultimeterRange, MultimeterResolution, SignalType"
+        ) from None
+
+
+def _require_enum(value: Any, enum_cls: type, arg_name: str) -> None:
+    """raises a RuntimeError unless the argument is a member of the given enum"""
+    if type(value) is not enum_cls:
+        raise RuntimeError(
+            f"Invalid type: {type(value)} for {arg_name}. {arg_name} needs to be a valid enum of type: {enum_cls.__name__}"
+        )
+
+
 ### Wrapper class implementing SCPI functions ###
 class KeysightU3606Wrapper:
     """Wrapper class for utilitzing the power supply and multimeter functions of Keysight U3606 DC power supply / Multimeter"""
 
+    # fixed set of attributes, no per-instance __dict__
+    __slots__ = (
+        "_device_manager",
+        "_device_url",
+        "_serial_no",
+        "_device_handle",
+        "_handle_write",
+        "_handle_query",
+        "_target_device_found",
+        "_detected_devices",
+        "_serial_index",
+        "_chunk_size",
+        "_binary_transfer",
+        "_reuse_session",
+        "_chained_commands",
+        "_pending_commands",
+        "_data_format_commands",
+        "_lock",
+        "_config_cache",
+        "_config_cache_ttl",
+        "_session_state",
+        "_io_events_handle",
+    )
+
+    # sessions kept open by wrappers created with reuse_session, keyed by (id of the resource manager, serial number):
+    # (resource name, handle, lock, configuration cache, session state) shared by the wrappers reusing the session
+    _session_pool: ClassVar[
+        Dict[
+            Tuple[int, str],
+            Tuple[str, Any, Any, Dict[str, Tuple[float, str]], Dict[str, Any]],
+        ]
+    ] = {}
+
     def __init__(
         self,
         serial_no: str,
-        pyvisa_device_manager: pyvisa.ResourceManager,
+        pyvisa_device_manager: "pyvisa.ResourceManager",
         pyvisa_devices: Tuple[str, ...],
+        serial_index: Optional[Dict[str, str]] = None,
+        binary_transfer: bool = False,
+        chunk_size: int = 1 << 20,
+        reuse_session: bool = False,
+        chained_commands: bool = True,
+        config_cache_ttl: float = CONFIG_CACHE_TTL,
     ) -> None:
-        """Iniitalize Pyvisa interface and detect connected instruments"""
+        """
+        Iniitalize Pyvisa interface and detect connected instruments
+
+        Args:
+            serial_no (str): serial number of the instrument to connect to
+            pyvisa_device_manager (pyvisa.ResourceManager): Pyvisa resource manager
+            pyvisa_devices (Tuple[str, ...]): VISA resources detected by the resource manager
+            serial_index (Dict[str, str], optional): detected USB resources keyed by serial number (see index_resources_by_serial)
+            binary_transfer (bool, optional): transfer measurement readings as binary REAL,64 blocks instead of ASCII. Defaults to False.
+            chunk_size (int, optional): VISA read chunk size in bytes, should exceed the largest response (e.g. logged data). Defaults to 1 MB.
+            reuse_session (bool, optional): keep the session open on close() and reuse it when the instrument is opened again in this process. Defaults to False.
+            chained_commands (bool, optional): join successive commands into compound (semicolon separated) messages, disable for VISA setups rejecting them. Defaults to True.
+            config_cache_ttl (float, optional): seconds a configuration query response is reused for (0 disables the cache). Defaults to CONFIG_CACHE_TTL.
+        """
 
         self._device_manager = pyvisa_device_manager
         self._device_url = ""
         self._serial_no = serial_no
         self._device_handle = None
+        # bound write / query methods of the session handle, resolved once in open() (see _bind_handle)
+        self._handle_write = None
+        self._handle_query = None
         self._target_device_found = False
         self._detected_devices = pyvisa_devices
+        self._serial_index = serial_index or {}
+        self._chunk_size = chunk_size
+        self._binary_transfer = binary_transfer
+        self._reuse_session = reuse_session
+        self._chained_commands = chained_commands
+        # commands held back within a coalesce_writes() block (None: commands are sent right away)
+        self._pending_commands: Optional[List[str]] = None
+        # state shared by the wrappers reusing the session (see _output_enabled)
+        self._session_state: Dict[str, Any] = {"output_enabled": None}
+        # session on which I/O completion events are queued (see submit_measure)
+        self._io_events_handle = None
+        self._data_format_commands = (
+            ("FORM:DATA REAL,64", "FORM:BORD SWAP") if binary_transfer else ()
+        )
+        # PyVISA sessions are not thread safe, every VISA call on the session takes this lock
+        self._lock = threading.RLock()
+        # configuration query responses by SCPI query (see _cached_query)
+        self._config_cache: Dict[str, Tuple[float, str]] = {}
+        self._config_cache_ttl = config_cache_ttl
 
         if not self._detected_devices:
             raise RuntimeError(
@@ -182,70 +316,298 @@ class KeysightU3606Wrapper:
     def open(self) -> None:
         """Opens the connection to a USB connected U3606"""
 
-        for device in self._detected_devices:
-            # Scan for USB devices
-            if device.find("USB") == 0 and self._serial_no in str(device):
-                self._device_url = device
-                self._device_handle = self._device_manager.open_resource(
-                    self._device_url
-                )
-                device_info = self._device_handle.query("*IDN?")
-                # ckech it is a U3606 mode instrument
-                if "U3606" in str(device_info):
-                    logger.info(
-                        f"Opened connection to instrument: {device_info}"
+        # a session left open by a previous wrapper of the same resource manager was already identified
+        pooled = (
+            self._session_pool.get(self._pool_key)
+            if self._reuse_session
+            else None
+        )
+        if pooled is not None:
+            try:
+                # raises once the session was closed (e.g. with its resource manager)
+                pooled[1].session
+            except Exception:
+                self._session_pool.pop(self._pool_key, None)
+            else:
+                # the wrappers sharing the session also share its lock and cached state
+                (
+                    self._device_url,
+                    device_handle,
+                    self._lock,
+                    self._config_cache,
+                    self._session_state,
+                ) = pooled
+                self._bind_handle(device_handle)
+                self._target_device_found = True
+                if self._data_format_commands:
+                    self.batch_write(*self._data_format_commands)
+                return None
+
+        # look up the device by serial number, fall back to scanning the detected USB devices
+        for device in find_serial_resources(
+            self._serial_no, self._detected_devices, self._serial_index
+        ):
+            self._device_url = device
+            self._bind_handle(
+                self._device_manager.open_resource(self._device_url)
+            )
+            # read long responses in a single chunk instead of many small USB transfers
+            self._device_handle.chunk_size = self._chunk_size
+            # responses are terminated with a line feed, configure it on the session once
+            self._device_handle.read_termination = "\n"
+            self._device_handle.write_termination = "\n"
+            device_info = self._query("*IDN?")
+            # ckech it is a U3606 mode instrument
+            if "U3606" in str(device_info):
+                logger.info("Opened connection to instrument: %s", device_info)
+                self._target_device_found = True
+                if self._reuse_session:
+                    self._session_pool[self._pool_key] = (
+                        self._device_url,
+                        self._device_handle,
+                        self._lock,
+                        self._config_cache,
+                        self._session_state,
                     )
-                    self._target_device_found = True
-                    return None
+                if self._data_format_commands:
+                    self.batch_write(*self._data_format_commands)
+                return None
+
+            # another instrument model carries the serial number
+            self._device_handle.close()
+            self._device_handle = None
 
         if not self._target_device_found:
             raise RuntimeError(
                 f"Could not detect target device of model: U3606 and serial no: {self._serial_no}"
             )
 
-    def close(self) -> None:
-        """Closes the connection session to connected device"""
+    @property
+    def _pool_key(self) -> Tuple[int, str]:
+        """key of the session in the session pool, sessions are only shared within the same resource manager"""
+        return (id(self._device_manager), self._serial_no)
+
+    @property
+    def _output_enabled(self) -> Optional[bool]:
+        """last known DC output state (None: unknown, e.g. changed by a generic command or on the front panel)"""
+        return self._session_state["output_enabled"]
+
+    @_output_enabled.setter
+    def _output_enabled(self, enabled: Optional[bool]) -> None:
+        self._session_state["output_enabled"] = enabled
+
+    def _bind_handle(self, device_handle: Any) -> None:
+        """sets the session handle, its write / query methods are looked up once instead of on every command"""
+        self._device_handle = device_handle
+        self._handle_write = device_handle.write
+        self._handle_query = device_handle.query
+
+    def _write(self, command: str) -> None:
+        """sends a command to the instrument, serialized with the other threads using the session"""
+        with self._lock:
+            # any command may change the configuration
+            self._config_cache.clear()
+            if self._pending_commands is not None:
+                self._pending_commands.append(command)
+            else:
+                self._handle_write(command)
+
+    def _send_pending(self) -> None:
+        """sends the commands held back by coalesce_writes() (as a single message when chained_commands is enabled)"""
+        with self._lock:
+            commands = self._pending_commands
+            if not commands:
+                return
+            self._pending_commands = []
+            if self._chained_commands:
+                self._handle_write(join_scpi_commands(commands))
+            else:
+                for command in commands:
+                    self._handle_write(command)
+
+    @contextlib.contextmanager
+    def coalesce_writes(self) -> Iterator[None]:
+        """
+        holds back the commands issued within the block and sends them when the block exits
+        NOTE: saves one bus transaction per setter call, any query issued within the block sends the held back commands first
+        """
+        if self._pending_commands is not None:
+            # nested block, the outermost block sends the commands
+            yield
+            return
+
+        self._pending_commands = []
+        try:
+            yield
+        finally:
+            self._send_pending()
+            self._pending_commands = None
+
+    def _query(self, command: str) -> str:
+        """sends a query to the instrument and returns the response, serialized with the other threads using the session"""
+        with self._lock:
+            self._send_pending()
+            return self._handle_query(command)
+
+    def _query_float(self, command: str) -> float:
+        """
+        queries a single numeric value, read with a single bulk transfer and parsed from the raw bytes
+        (float() accepts bytes and strips the termination, no decoded string is built)
+        """
+        return float(self._query_bytes(command))
+
+    def _query_int(self, command: str) -> int:
+        """queries a single integer value (e.g. "+1280" register sums), parsed from the raw bytes"""
+        return int(self._query_bytes(command))
+
+    def _query_reading(self, command: str) -> float:
+        """queries a single measurement reading in the configured transfer format (binary or ASCII)"""
+        if self._binary_transfer:
+            return self._query_array(command)[0]
+        return self._query_float(command)
+
+    def _query_array(self, command: str) -> np.ndarray:
+        """queries measurement readings in the configured transfer format (binary or ASCII)"""
+        with self._lock:
+            self._send_pending()
+            if self._binary_transfer:
+                return self._device_handle.query_binary_values(
+                    command,
+                    datatype="d",
+                    is_big_endian=False,
+                    container=np.ndarray,
+                )
+            return self._device_handle.query_ascii_values(
+                command, container=np.ndarray
+            )
+
+    def _query_bytes(self, command: str, n_bytes: int = 64) -> bytes:
+        """
+        queries a short response and returns it undecoded, read with a single bulk transfer of
+        up to n_bytes instead of scanning the response for the termination character
+        """
+        with self._lock:
+            self._send_pending()
+            self._handle_write(command)
+            return self._device_handle.read_bytes(
+                n_bytes, break_on_termchar=True
+            )
+
+    def _cached_query(self, command: str) -> str:
+        """
+        returns the response to a configuration query, reusing a response received within the TTL
+        NOTE: the cache is cleared by every command sent to the instrument and by measure()
+        """
+        cached = self._config_cache.get(command)
+        if (
+            cached is not None
+            and time.monotonic() - cached[0] < self._config_cache_ttl
+        ):
+            return cached[1]
+
+        with self._lock:
+            response = self._query(command)
+            self._config_cache[command] = (time.monotonic(), response)
+        return response
+
+    def close(self, force: bool = False) -> None:
+        """
+        Closes the connection session to connected device
+        A session opened with reuse_session stays open for the next wrapper, unless force is set
+        """
 
         if self._device_handle:
+            if self._reuse_session:
+                if not force:
+                    return None
+                self._session_pool.pop(self._pool_key, None)
+
             self._device_handle.close()
             logger.info(
-                f"Closed connection session to instrument: {self._device_url}"
+                "Closed connection session to instrument: %s", self._device_url
+            )
+
+    @classmethod
+    def purge_sessions(cls) -> None:
+        """closes all the sessions kept open by wrappers created with reuse_session"""
+        while cls._session_pool:
+            device_url, device_handle, *_ = cls._session_pool.popitem()[1]
+            device_handle.close()
+            logger.info(
+                "Closed connection session to instrument: %s", device_url
             )
 
     def clear_presets(self) -> None:
         """clears preset status bit register of the connected instrument"""
 
-        self._device_handle.write("*rst; status:preset; *cls")
+        self.batch_write(
+            "*rst; status:preset; *cls", *self._data_format_commands
+        )
+        # *RST puts the output on standby
+        self._output_enabled = False
+        logger.info("Cleared instrument presets")
+
+    def teardown(self) -> None:
+        """
+        leaves the instrument idle with cleared presets / status and closes the connection session
+        NOTE: a single message (*rst; status:preset; *cls) is written before closing, the data format is not restored
+        """
+        self._write("*rst; status:preset; *cls")
+        self._output_enabled = False
         logger.info("Cleared instrument presets")
+        self.close()
 
     def clear_status(self) -> None:
         """clears all event status registers / error queue of the connected instrument"""
 
-        self._device_handle.write("*CLS")
+        self._write("*CLS")
         logger.info("Cleared all instrument event status registers / errors")
 
     def reset_defaults(self) -> None:
         """resets the instrument to its factory default state"""
-        self._device_handle.write("*RST")
+        self.batch_write("*RST", *self._data_format_commands)
+        self._output_enabled = False
         logger.info("U3606 reset to default factory state")
 
+    def batch_write(self, *commands: str) -> None:
+        """
+        sends several SCPI commands to the instrument as a single compound (semicolon separated) message
+        NOTE: saves one bus transaction per command compared to writing the commands one by one
+        (the commands are written one by one when chained_commands is disabled)
+        """
+        if self._chained_commands:
+            self._write(join_scpi_commands(commands))
+        else:
+            for command in commands:
+                self._write(command)
+        # the commands may switch the output
+        self._output_enabled = None
+
+    def save_state(self, slot: int) -> None:
+        """
+        stores the current instrument state (output / measurement configuration) in the given
+        non-volatile storage location. The state can be restored later with recall_state()
+        """
+        self._write(f"*SAV {slot}")
+
+    def recall_state(self, slot: int) -> None:
+        """restores the instrument state previously stored by save_state() in the given storage location"""
+        self._write(f"*RCL {slot}")
+        self._output_enabled = None
+
     def wait(self) -> None:
         """
         configures the instrument's output buffer to wait until
         all pending operations are complete, before executing any subsequent commands or queries
         """
-        self._device_handle.write("*WAI")
+        self._write("*WAI")
 
     def is_operation_complete(self) -> bool:
         """
         returns true if the current operation is completed by the instrument (+1 is returned by query when operation is completed)
         NOTE: used to synchronize running application with the instrument
         """
-        completion_code_found = self._device_handle.query("*OPC?").find("1")
-        if completion_code_found == 0:
-            return True
-        else:
-            return False
+        return self._query_bytes("*OPC?")[:1] == b"1"
 
     def query_system_errors(self) -> str:
         """
@@ -255,8 +617,17 @@ class KeysightU3606Wrapper:
         For SCPI command errors, this command returns the following format string:
         <Number,"Error String">
         """
-        error_queue = self._device_handle.query("SYST:ERR?")
-        return str(error_queue)
+        return self._query("SYST:ERR?")
+
+    def _configure_output(self, *commands: str) -> None:
+        """
+        applies DC supply settings in a single message, preceded by disabling the output (required to configure)
+        NOTE: the output is not disabled again when it is known to be on standby already
+        """
+        if self._output_enabled is not False:
+            commands = ("OUTP:STAT OFF", *commands)
+        self.batch_write(*commands)
+        self._output_enabled = False
 
     def configure_dc_supply(
         self,
@@ -279,44 +650,43 @@ class KeysightU3606Wrapper:
             current_range (DCOutputCurrentRange): range for the current output (default: DEFAULT)
         """
         # check arguments
-        if not isinstance(output_mode, DCOutputMode):
-            raise RuntimeError(
-                f"Invalid type: {type(output_mode)} for output_mode. output_mode needs to be a valid enum of type: {DCOutputMode._name_}"
-            )
-
-        if not isinstance(voltage_range, DCOutputVoltageRange):
-            raise RuntimeError(
-                f"Invalid type: {type(voltage_range)} for voltage_range. voltage_range needs to be a valid enum of type: {DCOutputVoltageRange._name_}"
-            )
-
-        if not isinstance(current_range, DCOutputCurrentRange):
-            raise RuntimeError(
-                f"Invalid type: {type(current_range)} for current_range. current_range needs to be a valid enum of type: {DCOutputCurrentRange._name_}"
-            )
-
-        # first disable the output (required to configure)
-        self.disable_dc_output()
+        _require_enum(output_mode, DCOutputMode, "output_mode")
+        _require_enum(voltage_range, DCOutputVoltageRange, "voltage_range")
+        _require_enum(current_range, DCOutputCurrentRange, "current_range")
 
+        # the output is disabled first (required to configure), see _configure_output
         # CV mode
         if output_mode.value == DCOutputMode.CONSTANT_VOLTAGE.value:
+            if not 0 <= output_value <= MAX_VOLTAGE_LIMIT:
+                raise RuntimeError(
+                    f"Invalid value for output_voltage. limits are: Min {0} V, Max {MAX_VOLTAGE_LIMIT} V"
+                )
             # set source voltage, over current limit and voltage range for the output
-            self.set_dc_supply_output_voltage(output_value)
-            self._device_handle.write("SOUR:CURR:LIM %s" % over_current_limit)
-            self._device_handle.write(
-                "SOUR:VOLT:RANG %s" % voltage_range.value
+            self._configure_output(
+                f"SOUR:VOLT:LEV:IMM:AMPL {output_value}",
+                f"SOUR:CURR:LIM {over_current_limit}",
+                f"SOUR:VOLT:RANG {voltage_range.value}",
             )
 
         # CC mode
         else:
+            if not 0 <= output_value <= MAX_CURRENT_LIMIT:
+                raise RuntimeError(
+                    f"Invalid value for output_current. limits are: Min {0} A, Max {MAX_CURRENT_LIMIT} A"
+                )
             # set source current, over voltage limit and current range for the output
-            self.set_dc_supply_output_current(output_value)
-            self._device_handle.write("SOUR:VOLT:LIM %s" % over_voltage_limit)
-            self._device_handle.write(
-                "SOUR:CURR:RANG %s" % current_range.value
+            self._configure_output(
+                f"SOUR:CURR:LEV:IMM:AMPL {output_value}",
+                f"SOUR:VOLT:LIM {over_voltage_limit}",
+                f"SOUR:CURR:RANG {current_range.value}",
             )
 
-        logging.info(
-            f"DC supply configured with the following options: {output_mode.name}, output value: {output_value} (Volts / Amps), (Voltage Range): {voltage_range.name}, (Current Range): {current_range.name}"
+        logger.info(
+            "DC supply configured with the following options: %s, output value: %s (Volts / Amps), (Voltage Range): %s, (Current Range): %s",
+            output_mode.name,
+            output_value,
+            voltage_range.name,
+            current_range.name,
         )
 
     def configure_dc_supply_ramp_func(
@@ -334,28 +704,30 @@ class KeysightU3606Wrapper:
             ramp_steps (int): the number of steps for the voltage/current ramp signal (1 to 10000) steps (default: 100 steps)
         """
         # check arguments
-        if not isinstance(output_mode, DCOutputMode):
-            raise RuntimeError(
-                f"Invalid type: {type(output_mode)} for output_mode. output_mode needs to be a valid enum of type: {DCOutputMode._name_}"
-            )
-
-        # first disable the output
-        self.disable_dc_output()
+        _require_enum(output_mode, DCOutputMode, "output_mode")
 
+        # the output is disabled first, see _configure_output
         # CV mode
         if output_mode.value == DCOutputMode.CONSTANT_VOLTAGE.value:
             # set ramp voltage level and number of steps
-            self._device_handle.write("VOLT:RAMP %s" % ramp_value)
-            self._device_handle.write("VOLT:RAMP:STEP %s" % ramp_steps)
+            self._configure_output(
+                f"VOLT:RAMP {ramp_value}",
+                f"VOLT:RAMP:STEP {ramp_steps}",
+            )
 
         # CC mode
         else:
             # set ramp current level and number of steps
-            self._device_handle.write("CURR:RAMP %s" % ramp_value)
-            self._device_handle.write("CURR:RAMP:STEP %s" % ramp_steps)
+            self._configure_output(
+                f"CURR:RAMP {ramp_value}",
+                f"CURR:RAMP:STEP {ramp_steps}",
+            )
 
-        logging.info(
-            f"DC supply ramp function configured with the following options: {output_mode.name}, ramp value: {ramp_value} (Volts / Amps), ramp_steps: {ramp_steps} steps"
+        logger.info(
+            "DC supply ramp function configured with the following options: %s, ramp value: %s (Volts / Amps), ramp_steps: %s steps",
+            output_mode.name,
+            ramp_value,
+            ramp_steps,
         )
 
     def configure_dc_supply_scan_func(
@@ -376,30 +748,33 @@ class KeysightU3606Wrapper:
 
         """
         # check arguments
-        if not isinstance(output_mode, DCOutputMode):
-            raise RuntimeError(
-                f"Invalid type: {type(output_mode)} for output_mode. output_mode needs to be a valid enum of type: {DCOutputMode._name_}"
-            )
-
-        # first disable the output
-        self.disable_dc_output()
+        _require_enum(output_mode, DCOutputMode, "output_mode")
 
+        # the output is disabled first, see _configure_output
         # CV mode
         if output_mode.value == DCOutputMode.CONSTANT_VOLTAGE.value:
             # set scan voltage level, number of steps and dwelling time
-            self._device_handle.write("VOLT:SCAN %s" % scan_value)
-            self._device_handle.write("VOLT:SCAN:STEP %s" % scan_steps)
-            self._device_handle.write("VOLT:SCAN:DWEL %s" % scan_dwelling)
+            self._configure_output(
+                f"VOLT:SCAN {scan_value}",
+                f"VOLT:SCAN:STEP {scan_steps}",
+                f"VOLT:SCAN:DWEL {scan_dwelling}",
+            )
 
         # CC mode
         else:
             # set scan current level, number of steps and dwelling time
-            self._device_handle.write("CURR:SCAN %s" % scan_value)
-            self._device_handle.write("CURR:SCAN:STEP %s" % scan_steps)
-            self._device_handle.write("CURR:SCAN:DWEL %s" % scan_dwelling)
+            self._configure_output(
+                f"CURR:SCAN {scan_value}",
+                f"CURR:SCAN:STEP {scan_steps}",
+                f"CURR:SCAN:DWEL {scan_dwelling}",
+            )
 
-        logging.info(
-            f"DC supply scan function configured with the following options: {output_mode.name}, scan value: {scan_value} (Volts / Amps), scan_steps: {scan_steps} steps, dwelling time: {scan_dwelling} sec"
+        logger.info(
+            "DC supply scan function configured with the following options: %s, scan value: %s (Volts / Amps), scan_steps: %s steps, dwelling time: %s sec",
+            output_mode.name,
+            scan_value,
+            scan_steps,
+            scan_dwelling,
         )
 
     def configure_dc_supply_square_func(
@@ -422,35 +797,39 @@ class KeysightU3606Wrapper:
             pulse_width (float): pulse width for the square-wave output (0 to 1.6667) ms (default 0.8333) ms
 
         """
-        # first disable the output
-        self.disable_dc_output()
-
-        self._device_handle.write("SQU:AMPL %s" % amplitude)
-        self._device_handle.write("SQU:FREQ %s" % frequency)
-        self._device_handle.write("SQU:DCYC %s" % duty_cycle)
-        self._device_handle.write("SQU:PWID %s" % pulse_width)
+        # the output is disabled first, see _configure_output
+        self._configure_output(
+            f"SQU:AMPL {amplitude}",
+            f"SQU:FREQ {frequency}",
+            f"SQU:DCYC {duty_cycle}",
+            f"SQU:PWID {pulse_width}",
+        )
 
-        logging.info(
-            f"DC supply sqaure wave function configured with the following options: amplitude: {amplitude} V, frequency: {frequency} Hz, duty cycle: {duty_cycle} %, pulse width: {pulse_width} sec"
+        logger.info(
+            "DC supply sqaure wave function configured with the following options: amplitude: %s V, frequency: %s Hz, duty cycle: %s %%, pulse width: %s sec",
+            amplitude,
+            frequency,
+            duty_cycle,
+            pulse_width,
         )
 
     def set_dc_supply_output_voltage(self, output_voltage: float) -> None:
         """Sets the constant voltage output value"""
 
-        if output_voltage < 0 or output_voltage > MAX_VOLTAGE_LIMIT:
+        if not 0 <= output_voltage <= MAX_VOLTAGE_LIMIT:
             raise RuntimeError(
                 f"Invalid value for output_voltage. limits are: Min {0} V, Max {MAX_VOLTAGE_LIMIT} V"
             )
-        self._device_handle.write("SOUR:VOLT:LEV:IMM:AMPL %s" % output_voltage)
+        self._write(f"SOUR:VOLT:LEV:IMM:AMPL {output_voltage}")
 
     def set_dc_supply_output_current(self, output_current: float) -> None:
         """Sets the constant current output value"""
 
-        if output_current < 0 or output_current > MAX_CURRENT_LIMIT:
+        if not 0 <= output_current <= MAX_CURRENT_LIMIT:
             raise RuntimeError(
-                f"Invalid value for output_current. limits are: Min {0} A, Max {MAX_VOLTAGE_LIMIT} A"
+                f"Invalid value for output_current. limits are: Min {0} A, Max {MAX_CURRENT_LIMIT} A"
             )
-        self._device_handle.write("SOUR:CURR:LEV:IMM:AMPL %s" % output_current)
+        self._write(f"SOUR:CURR:LEV:IMM:AMPL {output_current}")
 
     def set_dc_supply_protection_voltage(self, ovp_limit: float) -> None:
         """
@@ -466,7 +845,7 @@ class KeysightU3606Wrapper:
 
 
         """
-        self._device_handle.write("VOLT:PROT %s V" % ovp_limit)
+        self._write(f"VOLT:PROT {ovp_limit} V")
 
     def set_dc_supply_protection_current(self, ocp_limit: float) -> None:
         """
@@ -481,22 +860,24 @@ class KeysightU3606Wrapper:
         the over-current protection value.
 
         """
-        self._device_handle.write("CURR:PROT %s A" % ocp_limit)
+        self._write(f"CURR:PROT {ocp_limit} A")
 
     def enable_dc_output(self) -> None:
         """enables the source output of the source multimeter (Output is active and the OUT annunciator turns on)"""
-        self._device_handle.write("OUTP:STAT ON")
+        self._write("OUTP:STAT ON")
+        self._output_enabled = True
 
     def disable_dc_output(self) -> None:
         """disables the source output of the source multimeter (Output is on standby and the SBY annunciator turns on)"""
 
-        self._device_handle.write("OUTP:STAT OFF")
+        self._write("OUTP:STAT OFF")
+        self._output_enabled = False
 
     def set_dc_supply_soft_steps(self, num_steps: int = 1) -> None:
         """
         sets the soft start step for constant voltage or constant current output (default: 1)
         """
-        self._device_handle.write("SST:STEP %s" % num_steps)
+        self._write(f"SST:STEP {num_steps}")
 
     def configure_multimeter(
         self,
@@ -515,55 +896,25 @@ class KeysightU3606Wrapper:
                 signal_type (SignalType): measure AC or DC component (default: DC)
         """
 
-        # check arguments
-        if not isinstance(measure_mode, MultimeterMode):
-            raise RuntimeError(
-                f"Invalid type: {type(measure_mode)} for measure_mode. measure_mode needs to be a valid enum of type: {MultimeterMode._name_}"
-            )
-
-        if not isinstance(measure_range, MultimeterRange):
-            raise RuntimeError(
-                f"Invalid type: {type(measure_range)} for measure_range. measure_range needs to be a valid enum of type: {MultimeterRange._name_}"
-            )
-
-        if not isinstance(measure_resolution, MultimeterResolution):
-            raise RuntimeError(
-                f"Invalid type: {type(measure_resolution)} for measure_resolution. measure_resolution needs to be a valid enum of type: {MultimeterResolution._name_}"
-            )
-
-        if not isinstance(signal_type, SignalType):
-            raise RuntimeError(
-                f"Invalid type: {type(signal_type)} for signal_type. signal_type needs to be a valid enum of type: {SignalType._name_}"
-            )
-
-        # Configure for Voltage or current measurement
-        if (
-            measure_mode.value == MultimeterMode.VOLTAGE.value
-            or measure_mode.value == MultimeterMode.CURRENT.value
-        ):
-            self._device_handle.write(
-                "CONF:%s:%s %s, %s"
-                % (
-                    measure_mode.value,
-                    signal_type.value,
-                    measure_range.value,
-                    measure_resolution.value,
-                )
-            )
-
-        # Configure for Resistance measurement
-        else:
-            self._device_handle.write(
-                "CONF:%s %s, %s"
-                % (
-                    measure_mode.value,
-                    measure_range.value,
-                    measure_resolution.value,
-                )
+        # Configure for Voltage, current or resistance measurement
+        self._write(
+            _multimeter_command(
+                _CONF_CMD,
+                measure_mode,
+                measure_range,
+                measure_resolution,
+                signal_type,
             )
+        )
 
         logger.info(
-            f"U3606 configured for following measuremnt setting: {signal_type.value, measure_mode.value, measure_range.value, measure_resolution.value}"
+            "U3606 configured for following measuremnt setting: %s",
+            (
+                signal_type.value,
+                measure_mode.value,
+                measure_range.value,
+                measure_resolution.value,
+            ),
         )
 
     def measure(
@@ -585,58 +936,48 @@ class KeysightU3606Wrapper:
             Returns: measured value (reading from device)
         """
 
-        # check arguments
-        if not isinstance(measure_mode, MultimeterMode):
-            raise RuntimeError(
-                f"Invalid type: {type(measure_mode)} for measure_mode. measure_mode needs to be a valid enum of type: {MultimeterMode._name_}"
-            )
+        command = _multimeter_command(
+            _MEASURE_CMD,
+            measure_mode,
+            measure_range,
+            measure_resolution,
+            signal_type,
+        )
 
-        if not isinstance(measure_range, MultimeterRange):
-            raise RuntimeError(
-                f"Invalid type: {type(measure_range)} for measure_range. measure_range needs to be a valid enum of type: {MultimeterRange._name_}"
-            )
+        # MEAS? reconfigures the multimeter
+        self._config_cache.clear()
 
-        if not isinstance(measure_resolution, MultimeterResolution):
-            raise RuntimeError(
-                f"Invalid type: {type(measure_resolution)} for measure_resolution. measure_resolution needs to be a valid enum of type: {MultimeterResolution._name_}"
-            )
+        return self._query_reading(command)
 
-        if not isinstance(signal_type, SignalType):
-            raise RuntimeError(
-                f"Invalid type: {type(signal_type)} for signal_type. signal_type needs to be a valid enum of type: {SignalType._name_}"
-            )
-
-        # voltage or current measurement
-        if (
-            measure_mode.value == MultimeterMode.VOLTAGE.value
-            or measure_mode.value == MultimeterMode.CURRENT.value
-        ):
-            value = float(
-                self._device_handle.query(
-                    "MEAS:%s:%s? %s, %s"
-                    % (
-                        measure_mode.value,
-                        signal_type.value,
-                        measure_range.value,
-                        measure_resolution.value,
-                    )
-                )
-            )
+    def configure_and_measure(
+        self,
+        measure_mode: MultimeterMode,
+        measure_range: MultimeterRange = MultimeterRange.AUTO,
+        measure_resolution: MultimeterResolution = MultimeterResolution.MIN,
+        signal_type: SignalType = SignalType.DC,
+    ) -> float:
+        """
+        same as configure_multimeter() followed by read(), sent as a single compound (CONF;READ?) query
 
-        # resistance measurement
-        else:
-            value = float(
-                self._device_handle.query(
-                    "MEAS:%s? %s, %s"
-                    % (
-                        measure_mode.value,
-                        measure_range.value,
-                        measure_resolution.value,
-                    )
-                )
+        Remark:
+            - the configuration stays set, subsequent readings can be taken with read() / fetch()
+        """
+        command = join_scpi_commands(
+            (
+                _multimeter_command(
+                    _CONF_CMD,
+                    measure_mode,
+                    measure_range,
+                    measure_resolution,
+                    signal_type,
+                ),
+                "READ?",
             )
+        )
 
-        return float(value)
+        # CONF reconfigures the multimeter
+        self._config_cache.clear()
+        return self._query_reading(command)
 
     def abort_measure(self) -> None:
         """
@@ -645,7 +986,7 @@ class KeysightU3606Wrapper:
         may be useful to abort a measurement when the instrument is waiting for a trigger,
         for a long measurement, or for a long series of timed measurements.
         """
-        self._device_handle.write("ABOR")
+        self._write("ABOR")
 
     def fetch(self) -> float:
         """
@@ -665,8 +1006,33 @@ class KeysightU3606Wrapper:
               If you would like to obtain raw data, please do not enable the CALCulate functions.
 
         """
-        value = self._device_handle.query("FETC?")
-        return float(value)
+        value = self._query_reading("FETC?")
+        return value
+
+    def fetch_buffer(self, n_readings: int) -> List[float]:
+        """
+        takes n_readings measurements with the present multimeter configuration and transfers them all at once
+
+        Description:
+
+            Sets the sample count and initiates the measurement, the FETCh? response then carries all
+            the readings (comma separated) in a single transfer instead of one round trip per reading
+
+        Remarks:
+
+            - The FETCh? command waits until the measurements are complete.
+
+            - The sample count stays set for subsequent READ? / INITiate commands.
+        """
+        return self.fetch_array(n_readings).tolist()
+
+    def fetch_array(self, n_readings: int) -> np.ndarray:
+        """
+        same as fetch_buffer(), the readings are returned as a numpy array
+        (transferred as a binary REAL,64 block instead when binary_transfer is enabled)
+        """
+        self.batch_write(f"SAMP:COUN {n_readings}", "INIT")
+        return self._query_array("FETC?")
 
     def read(self) -> float:
         """
@@ -688,21 +1054,47 @@ class KeysightU3606Wrapper:
             sending the INITiate[:IMMediate] command followed immediately by the FETCh? command.
 
         """
-        value = self._device_handle.query("READ?")
-        return float(value)
+        value = self._query_reading("READ?")
+        return value
+
+    def read_array(self, n_readings: int) -> np.ndarray:
+        """
+        takes n_readings measurements and returns them as a numpy array, sent as a single compound (SAMP:COUN;READ?) query
+        (transferred as a binary REAL,64 block instead when binary_transfer is enabled)
 
-    def query(self, query_command: str) -> str:
-        """send a generic query request (SCPI Syntax) to the instrument and return the result"""
-        # wait for ongoing queries / commands to complete first
-        self.wait()
-        response = self._device_handle.query(query_command)
+        Remark:
+            - the sample count stays set, subsequent read() / fetch() calls return n_readings values
+        """
+        # SAMP:COUN changes the configuration
+        self._config_cache.clear()
+        return self._query_array(
+            join_scpi_commands((f"SAMP:COUN {n_readings}", "READ?"))
+        )
+
+    def query(self, query_command: str, wait: bool = False) -> str:
+        """
+        send a generic query request (SCPI Syntax) to the instrument and return the result
+        wait: wait for ongoing queries / commands to complete first (*WAI sent in the same message)
+        """
+        if wait:
+            query_command = join_scpi_commands(("*WAI", query_command))
+
+        # a generic query (e.g. MEAS?) may change the configuration
+        self._config_cache.clear()
+        response = self._query(query_command)
         return str(response)
 
-    def write(self, send_command: str) -> None:
-        """send a generic SCPI command to the instrument"""
-        # wait for ongoing queries / commands to complete first
-        self.wait()
-        self._device_handle.write(send_command)
+    def write(self, send_command: str, wait: bool = False) -> None:
+        """
+        send a generic SCPI command to the instrument
+        wait: wait for ongoing queries / commands to complete first (*WAI sent in the same message)
+        """
+        if wait:
+            send_command = join_scpi_commands(("*WAI", send_command))
+
+        self._write(send_command)
+        # the command may switch the output
+        self._output_enabled = None
 
     def enable_continuous_mode(self) -> None:
         """
@@ -711,7 +1103,7 @@ class KeysightU3606Wrapper:
         and you can just use the FETCh? command to acquire readings without triggering the source multimeter
         """
 
-        self._device_handle.write("INIT:CONT ON")
+        self._write("INIT:CONT ON")
 
     def disable_continuous_mode(self) -> None:
         """
@@ -721,55 +1113,59 @@ class KeysightU3606Wrapper:
             - sending the INITiate[:IMMediate] and the READ? command will also set the state of the initiate continuous mode to OFF
         """
 
-        self._device_handle.write("INIT:CONT OFF")
+        self._write("INIT:CONT OFF")
 
     def query_continuous_mode_status(self) -> int:
         """
         query the status of the initiate continuous mode (0: OFF, 1: ON)
+
+        Remark:
+            - not cached, READ? and INIT also turn the continuous mode off
         """
 
-        status = self._device_handle.query("INIT:CONT?")
-        return int(status)
+        status = self._query_int("INIT:CONT?")
+        return status
 
     def query_multimeter_configuration(self) -> str:
         """returns the current measurement configuration / range"""
-        value = self._device_handle.query("CONF?")
+        value = self._cached_query("CONF?")
         return str(value)
 
     def query_dc_supply_over_voltage_limit(self) -> float:
         """returns the over-voltage limit value for CC mode"""
-        value = self._device_handle.query("VOLT:LIM?")
+        value = self._cached_query("VOLT:LIM?")
         return float(value)
 
     def query_dc_supply_over_current_limit(self) -> float:
         """returns the over-current limit value for CV mode"""
-        value = self._device_handle.query("CURR:LIM?")
+        value = self._cached_query("CURR:LIM?")
         return float(value)
 
     def query_dc_supply_output_voltage(self) -> float:
         """returns the output voltage level for CV mode"""
-        value = self._device_handle.query("VOLT?")
-        return float(value)
+        value = self._query_float("VOLT?")
+        return value
 
     def query_dc_supply_output_current(self) -> float:
         """returns the output current level for CC mode"""
-        value = self._device_handle.query("CURR?")
-        return float(value)
+        value = self._query_float("CURR?")
+        return value
 
     def query_dc_supply_output_status(self) -> int:
         """returns the output status for DC supply (1: Output enabled, 0: Standby mode)"""
-        status = self._device_handle.query("OUTP?")
-        return int(status)
+        status = self._query_int("OUTP?")
+        self._output_enabled = status == 1
+        return status
 
     def query_dc_supply_sense_voltage(self) -> float:
         """returns the amplitude of the sensing voltage at the output for CC mode"""
-        value = self._device_handle.query("SENS:VOLT?")
-        return float(value)
+        value = self._query_float("SENS:VOLT?")
+        return value
 
     def query_dc_supply_sense_current(self) -> float:
         """returns the amplitude of the sensing current at the output for CV mode"""
-        value = self._device_handle.query("SENS:CURR?")
-        return float(value)
+        value = self._query_float("SENS:CURR?")
+        return value
 
     def calibrate(self) -> int:
         """
@@ -777,8 +1173,8 @@ class KeysightU3606Wrapper:
         value (CALibration:VALue command) and returns a boolean value that represents the calibration status: “+0” (calibration passed)
         or “+1” (calibration failed).
         """
-        cal_return_code = self._device_handle.query("CAL?")
-        return int(cal_return_code)
+        cal_return_code = self._query_int("CAL?")
+        return cal_return_code
 
     def enable_question_register(
         self, question_register: QuestionRegister
@@ -787,15 +1183,15 @@ class KeysightU3606Wrapper:
         enables a bit in the enable register for the Questionable Data register group
 
         """
-        # verfiy argument
-        if not isinstance(question_register, QuestionRegister):
+        # verfiy argument (only QuestionRegister members have a command)
+        try:
+            command = _QUES_ENAB_CMD[question_register]
+        except (KeyError, TypeError):
             raise RuntimeError(
-                f"Invalid type: {type(question_register)} for question_register. question_register must be an enum of type: {QuestionRegister._name_}"
-            )
+                f"Invalid type: {type(question_register)} for question_register. question_register must be an enum of type: {QuestionRegister.__name__}"
+            ) from None
 
-        self._device_handle.write(
-            "STAT:QUES:ENAB %s" % question_register.value
-        )
+        self._write(command)
 
     def query_enable_register(self) -> int:
         """
@@ -805,7 +1201,7 @@ class KeysightU3606Wrapper:
         the query command will return “+1280”
 
         """
-        enabled_reg = self._device_handle.query("STAT:QUES:ENAB?")
+        enabled_reg = self._cached_query("STAT:QUES:ENAB?")
         return int(enabled_reg)
 
     def query_event_register(self) -> int:
@@ -818,8 +1214,8 @@ class KeysightU3606Wrapper:
         (decimal value = 512) are set, this command will return the decimal value +514
 
         """
-        event_reg = self._device_handle.query("STAT:QUES?")
-        return int(event_reg)
+        event_reg = self._query_int("STAT:QUES?")
+        return event_reg
 
     def query_condition_register(self) -> int:
         """
@@ -831,33 +1227,35 @@ class KeysightU3606Wrapper:
         this command will return the decimal value “+5”
 
         """
-        cond_reg = self._device_handle.query("STAT:QUES:COND?")
-        return int(cond_reg)
+        cond_reg = self._query_int("STAT:QUES:COND?")
+        return cond_reg
 
     def set_calc_function(self, calc_func: CalcFunction) -> None:
         """selects the calculation function to be used by the mutlimeter on the perfromed measurements"""
 
-        # verfiy argument
-        if not isinstance(calc_func, CalcFunction):
+        # verfiy argument (only CalcFunction members have a command)
+        try:
+            command = _CALC_FUNC_CMD[calc_func]
+        except (KeyError, TypeError):
             raise RuntimeError(
-                f"Invalid type: {type(calc_func)} for calc_func. calc_func must be an enum of type: {CalcFunction._name_}"
-            )
+                f"Invalid type: {type(calc_func)} for calc_func. calc_func must be an enum of type: {CalcFunction.__name__}"
+            ) from None
 
-        self._device_handle.write("CALC:FUNC %s" % calc_func.value)
+        self._write(command)
 
     def query_calc_function(self) -> str:
         """returns the currently selected calculation function"""
-        calc_func = self._device_handle.query("CALC:FUNC?")
+        calc_func = self._cached_query("CALC:FUNC?")
         return str(calc_func)
 
     def query_calc_state(self) -> int:
         """returns a boolean value that represents the current calculation state: 0 (OFF) or 1 (TRUE)"""
-        calc_state = self._device_handle.query("CALC?")
+        calc_state = self._cached_query("CALC?")
         return int(calc_state)
 
     def enable_calc(self) -> None:
         """turns on the calculation subsystem, and thus the selected calculation function"""
-        self._device_handle.write("CALC ON")
+        self._write("CALC ON")
 
     def disable_calc(self) -> None:
         """
@@ -865,7 +1263,7 @@ class KeysightU3606Wrapper:
 
         remark: calculation subsystem is turned off when the calculation function is changed
         """
-        self._device_handle.write("CALC OFF")
+        self._write("CALC OFF")
 
     def read_calc_average(self) -> float:
         """
@@ -875,8 +1273,8 @@ class KeysightU3606Wrapper:
         remark: 0 is retruned if there is no data is available
         """
 
-        avg_val = self._device_handle.query("CALC:AVER:AVER?")
-        return float(avg_val)
+        avg_val = self._query_float("CALC:AVER:AVER?")
+        return avg_val
 
     def read_calc_max(self) -> float:
         """
@@ -886,8 +1284,8 @@ class KeysightU3606Wrapper:
         remark: 0 is retruned if there is no data is available
         """
 
-        max_val = self._device_handle.query("CALC:AVER:MAX?")
-        return float(max_val)
+        max_val = self._query_float("CALC:AVER:MAX?")
+        return max_val
 
     def read_calc_min(self) -> float:
         """
@@ -897,8 +1295,8 @@ class KeysightU3606Wrapper:
         remark: 0 is retruned if there is no data is available
         """
 
-        min_val = self._device_handle.query("CALC:AVER:MIN?")
-        return float(min_val)
+        min_val = self._query_float("CALC:AVER:MIN?")
+        return min_val
 
     def read_calc_present(self) -> float:
         """
@@ -907,8 +1305,8 @@ class KeysightU3606Wrapper:
         pre-requisite: calculation function selected and enabled
         remark: 0 is retruned if there is no data is available
         """
-        pres_val = self._device_handle.query("CALC:AVER:PRES?")
-        return float(pres_val)
+        pres_val = self._query_float("CALC:AVER:PRES?")
+        return pres_val
 
     def set_db_func_reference(self, ref_val: float) -> None:
         """
@@ -916,7 +1314,7 @@ class KeysightU3606Wrapper:
 
         range of values: -120 to 120 (default: 0)
         """
-        self._device_handle.write("CALC:DB:REF %s" % ref_val)
+        self._write(f"CALC:DB:REF {ref_val:.6g}")
 
     def set_dbm_func_reference(self, ref_val: int) -> None:
         """
@@ -924,7 +1322,7 @@ class KeysightU3606Wrapper:
 
         range of values: 1 ohm to 9999 ohms (default: 600 ohms)
         """
-        self._device_handle.write("CALC:DBM:REF %s" % ref_val)
+        self._write(f"CALC:DBM:REF {ref_val}")
 
     def set_hold_func_variation(self, var_val: float) -> None:
         """
@@ -934,7 +1332,7 @@ class KeysightU3606Wrapper:
         range of values: 0% to 100% (default: 10%)
 
         """
-        self._device_handle.write("CALC:HOLD:VAR %s" % var_val)
+        self._write(f"CALC:HOLD:VAR {var_val:.6g}")
 
     def set_hold_func_threshold(self, thr_val: float) -> None:
         """
@@ -942,7 +1340,7 @@ class KeysightU3606Wrapper:
         range of values: 0.0% to 9,9% (default: 0.5%)
 
         """
-        self._device_handle.write("CALC:HOLD:THR %s" % thr_val)
+        self._write(f"CALC:HOLD:THR {thr_val:.6g}")
 
     def set_limit_func_limits(
         self, upper_limit_val: float, lower_limit_val: float
@@ -953,8 +1351,10 @@ class KeysightU3606Wrapper:
         range of values: Voltage measurement (-1200 V to 1200 V), Current measurement (-12 A to 12 A), default: 0
 
         """
-        self._device_handle.write("CALC:LIM:UPP %s" % upper_limit_val)
-        self._device_handle.write("CALC:LIM:LOW %s" % lower_limit_val)
+        self.batch_write(
+            f"CALC:LIM:UPP {upper_limit_val:.6g}",
+            f"CALC:LIM:LOW {lower_limit_val:.6g}",
+        )
 
     def set_null_func_offset(self, offset_val: float) -> None:
         """
@@ -963,7 +1363,7 @@ class KeysightU3606Wrapper:
         range of values: Voltage measurement (-1200 V to 1200 V), Current measurement (-12 A to 12 A), default: 0
 
         """
-        self._device_handle.write("CALC:NULL:OFFS %s" % offset_val)
+        self._write(f"CALC:NULL:OFFS {offset_val:.6g}")
 
     def enable_data_logging(self) -> None:
         """
@@ -977,32 +1377,32 @@ class KeysightU3606Wrapper:
             - If there is data stored in the U3606, the new data will be appended to the old
             data. When the U3606 is recording, it will not accept any setting commands
         """
-        self._device_handle.write("LOG ON")
+        self._write("LOG ON")
 
     def disable_data_logging(self) -> None:
         """
         stops the U3606 data logging operation
         """
-        self._device_handle.write("LOG OFF")
+        self._write("LOG OFF")
 
     def query_data_logging_status(self) -> int:
         """
         returns the status of the data logging operation 1 (ON), 0 (OFF)
+        NOTE: not cached, logging stops on its own (e.g. once the log memory is full)
         """
-        status = self._device_handle.query("LOG?")
-        return int(status)
+        return self._query_int("LOG?")
 
     def delete_logged_data(self) -> None:
         """
         deletes all previously stored logging data
         """
-        self._device_handle.write("LOG:DATA:DEL")
+        self._write("LOG:DATA:DEL")
 
     def reset_data_logging_index(self) -> None:
         """
         resets the logging data load index to the start point
         """
-        self._device_handle.write("LOG:LOAD DATA")
+        self._write("LOG:LOAD DATA")
 
     def read_logged_data(self) -> Union[float, str]:
         """
@@ -1019,15 +1419,173 @@ class KeysightU3606Wrapper:
         - The data index could be changed if you send another command between the
         LOG:DATA? commands
         """
-        import re
+        logged_data = self._query("LOG:DATA?")
 
-        logged_data = self._device_handle.query("LOG:DATA?")
-
-        # match to find type of data is numeric
-        if re.match(r"^-?\d+(?:\.\d+)$", logged_data) is None:
-            return str(logged_data)
-        else:
+        # numeric records may use scientific notation (e.g. +1.234E-03)
+        try:
             return float(logged_data)
+        except ValueError:
+            return logged_data
+
+    def read_all_logged_data(self) -> np.ndarray:
+        """
+        returns all the previously stored (numeric) logging data from the start point
+
+        The load index is reset and the LOG:DATA? queries are chained into compound messages of
+        LOG_DATA_QUERIES_PER_MESSAGE queries each, until the END response is received
+        (instead of one round trip per logged value with read_logged_data)
+
+        A record which is not numeric raises RuntimeError instead of truncating the log
+        """
+        records = []
+        command = join_scpi_commands(
+            ["LOG:LOAD DATA"] + ["LOG:DATA?"] * LOG_DATA_QUERIES_PER_MESSAGE
+        )
+        with self._lock:
+            while True:
+                for record in self._query(command).split(";"):
+                    if record == "END":
+                        return np.array(records, dtype=np.float64)
+                    try:
+                        records.append(float(record))
+                    except ValueError as err:
+                        raise RuntimeError(
+                            f"Unexpected logged data record: {record!r}"
+                        ) from err
+
+                # continue from the current load index
+                command = join_scpi_commands(
+                    ["LOG:DATA?"] * LOG_DATA_QUERIES_PER_MESSAGE
+                )
+
+    ### Asynchronous VISA reads: the caller continues while the instrument measures ###
+    def submit_measure(
+        self,
+        measure_mode: MultimeterMode,
+        measure_range: MultimeterRange = MultimeterRange.AUTO,
+        measure_resolution: MultimeterResolution = MultimeterResolution.MIN,
+        signal_type: SignalType = SignalType.DC,
+        n_bytes: int = 64,
+    ) -> Any:
+        """
+        sends a measurement query and starts an asynchronous read (viReadAsync) of its response,
+        returns the VISA job id to pass to complete_measure()
+
+        NOTE: submitting to several instruments before completing them overlaps their measurements
+        without worker threads. No other command should be sent to this instrument in between
+        """
+        from pyvisa.constants import EventMechanism, EventType
+
+        command = _multimeter_command(
+            _MEASURE_CMD,
+            measure_mode,
+            measure_range,
+            measure_resolution,
+            signal_type,
+        )
+
+        with self._lock:
+            self._send_pending()
+            if self._io_events_handle is not self._device_handle:
+                self._device_handle.enable_event(
+                    EventType.io_completion, EventMechanism.queue
+                )
+                self._io_events_handle = self._device_handle
+
+            # MEAS? reconfigures the multimeter
+            self._config_cache.clear()
+            self._handle_write(command)
+            _, job_id, _ = self._device_handle.visalib.read_asynchronously(
+                self._device_handle.session, n_bytes
+            )
+        return job_id
+
+    def complete_measure(
+        self, job_id: Any, timeout_ms: Optional[int] = None
+    ) -> float:
+        """
+        waits for the asynchronous read started by submit_measure() and returns the measured value
+        timeout_ms defaults to the session timeout
+        """
+        from pyvisa.constants import EventType
+
+        if timeout_ms is None:
+            timeout_ms = self._device_handle.timeout
+
+        with self._lock:
+            while True:
+                # the event context is closed when the wait response is deleted, so keep it
+                # alive until the completion has been read and close it explicitly afterwards
+                response = self._device_handle.wait_on_event(
+                    EventType.io_completion, timeout_ms
+                )
+                event = response.event
+                data = None
+                try:
+                    completed_job_id = event.job_id
+                    if completed_job_id == job_id:
+                        # data holds the first return_count bytes of the job buffer
+                        data = event.data
+                finally:
+                    self._close_event(event)
+                # completions of jobs which were never collected are dropped
+                if completed_job_id == job_id:
+                    return float(data)
+
+    def _close_event(self, event: Any) -> None:
+        """closes a VISA event context (mirrors what pyvisa does when the wait response is deleted)"""
+        from pyvisa.errors import VisaIOError
+
+        try:
+            self._device_handle.visalib.close(event.context)
+        except VisaIOError:
+            pass
+        event.close()
+
+    ### asyncio variants: the blocking VISA round trip runs in a worker thread ###
+    def _call_locked(self, method: Callable, *args: Any, **kwargs: Any) -> Any:
+        """runs a wrapper method while holding the session lock (keeps its commands and queries together)"""
+        with self._lock:
+            return method(*args, **kwargs)
+
+    async def call_async(
+        self, method: Callable, *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        runs a (blocking) method of this wrapper in a worker thread, e.g. await psu.call_async(psu.query_dc_supply_output_voltage)
+        NOTE: lets several instruments be driven concurrently with asyncio.gather, calls on the same instrument take turns
+        """
+        return await asyncio.to_thread(
+            self._call_locked, method, *args, **kwargs
+        )
+
+    async def measure_async(
+        self,
+        measure_mode: MultimeterMode,
+        measure_range: MultimeterRange = MultimeterRange.AUTO,
+        measure_resolution: MultimeterResolution = MultimeterResolution.MIN,
+        signal_type: SignalType = SignalType.DC,
+    ) -> float:
+        """awaitable variant of measure()"""
+        return await self.call_async(
+            self.measure,
+            measure_mode,
+            measure_range,
+            measure_resolution,
+            signal_type,
+        )
+
+    async def fetch_async(self) -> float:
+        """awaitable variant of fetch()"""
+        return await self.call_async(self.fetch)
+
+    async def read_async(self) -> float:
+        """awaitable variant of read()"""
+        return await self.call_async(self.read)
+
+    async def query_async(self, query_command: str, wait: bool = False) -> str:
+        """awaitable variant of query()"""
+        return await self.call_async(self.query, query_command, wait)
 
 
 ### Context manager for using the power supply and mulitmeter functions within 'with' block ###
@@ -1038,7 +1596,7 @@ class KeysightU3606SupplyAndMultimeter:
 
     def __init__(
         self,
-        pyvisa_manager: pyvisa.ResourceManager,
+        pyvisa_manager: "pyvisa.ResourceManager",
         serial_no: str,
         dc_output_mode: Optional[DCOutputMode] = None,
         mulitimeter_mode: Optional[MultimeterMode] = None,
@@ -1059,10 +1617,9 @@ class KeysightU3606SupplyAndMultimeter:
     ):
         self.pyvisa_manager = pyvisa_manager
         self.serial_no = serial_no
-        self.pyvisa_devices = self.pyvisa_manager.list_resources()
-        self.keysgiht_u3606 = KeysightU3606Wrapper(
-            serial_no, self.pyvisa_manager, self.pyvisa_devices
-        )
+        # the instruments are only looked for on entering the context (see __enter__)
+        self.pyvisa_devices: Tuple[str, ...] = ()
+        self.keysgiht_u3606: Optional[KeysightU3606Wrapper] = None
         self.dc_output_mode = dc_output_mode
         self.dc_output_value: float = dc_output_value
         self.dc_output_volt_range = dc_output_volt_range
@@ -1073,24 +1630,29 @@ class KeysightU3606SupplyAndMultimeter:
         self.multimeter_signal = multimeter_signal
 
     def __enter__(self):
-        self.keysgiht_u3606.open()
-        if self.mulitimeter_mode is not None:
-            self.keysgiht_u3606.configure_multimeter(
-                self.mulitimeter_mode,
-                self.multimeter_range,
-                self.multimeter_res,
-                self.multimeter_signal,
-            )
-        if self.dc_output_mode is not None:
-            self.keysgiht_u3606.configure_dc_supply(
-                self.dc_output_mode,
-                self.dc_output_value,
-                voltage_range=self.dc_output_volt_range,
-                current_range=self.dc_output_curr_range,
+        if self.keysgiht_u3606 is None:
+            self.pyvisa_devices = list_resources_memoized(self.pyvisa_manager)
+            self.keysgiht_u3606 = KeysightU3606Wrapper(
+                self.serial_no, self.pyvisa_manager, self.pyvisa_devices
             )
+        self.keysgiht_u3606.open()
+        # the multimeter and DC supply settings are sent in a single message
+        with self.keysgiht_u3606.coalesce_writes():
+            if self.mulitimeter_mode is not None:
+                self.keysgiht_u3606.configure_multimeter(
+                    self.mulitimeter_mode,
+                    self.multimeter_range,
+                    self.multimeter_res,
+                    self.multimeter_signal,
+                )
+            if self.dc_output_mode is not None:
+                self.keysgiht_u3606.configure_dc_supply(
+                    self.dc_output_mode,
+                    self.dc_output_value,
+                    voltage_range=self.dc_output_volt_range,
+                    current_range=self.dc_output_curr_range,
+                )
         return self.keysgiht_u3606
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.keysgiht_u3606.clear_presets()
-        self.keysgiht_u3606.clear_status()
-        self.keysgiht_u3606.close()
+        self.keysgiht_u3606.teardown()
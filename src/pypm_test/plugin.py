@@ -1,86 +1,354 @@
 """Hook specifications for pytest plugins which are invoked by pytest itself and by builtin plugins"""
 
+import contextlib
+import logging
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from _pytest.config import Config
 from _pytest.config.argparsing import Parser
+from _pytest.main import Session
+from _pytest.nodes import Item
+from .keysight_u3606_wrapper import KeysightU3606Wrapper
+from .keysight_u2723_wrapper import KeysightU2723Wrapper
+from .instrument_utils import (
+    file_lock,
+    index_resources_by_serial,
+    list_resources_cached,
+    visa_run_files,
+)
+from typing import List, Optional, Union
 
+# Stash key of the instruments shared across the test session (see pytest_sessionstart)
+PYPM_SESSION = pytest.StashKey[SimpleNamespace]()
 
-def pytest_addoption(parser: Parser):
+# Fixtures talking to the instruments, their tests are grouped on a single pytest-xdist worker
+INSTRUMENT_FIXTURES = frozenset(("pyvisa_session", "psu_handle", "smu_handle"))
+
+
+# pytest.ini options registered by the plugin: (name, type, default, help)
+INI_OPTIONS = (
+    # PyVISA options
+    ########################################################
+    (
+        "pyvisa_verbose",
+        "bool",
+        False,
+        "Log every VISA transaction to the screen (slows down instrument communication)",
+    ),
     # Keysight U3606 DC Power Supply / Multimeter options
     ########################################################
-    parser.addini(
+    (
         "psu_serial_no",
-        type="string",
-        default=None,
-        help="Serial number of the (PSU) power supply unit device to connect to",
-    )
-
-    parser.addini(
+        "string",
+        None,
+        "Serial number of the (PSU) power supply unit device to connect to",
+    ),
+    (
         "psu_multimeter_mode",
-        type="string",
-        default=None,
-        help="Configure the Multimeter measurement mode: [voltage, current, resistance]",
-    )
-
-    parser.addini(
+        "string",
+        None,
+        "Configure the Multimeter measurement mode: [voltage, current, resistance]",
+    ),
+    (
         "psu_constant_voltage_output",
-        type="string",
-        default=None,
-        help="Set DC supply constant voltage output value in Volts",
-    )
-
-    parser.addini(
+        "string",
+        None,
+        "Set DC supply constant voltage output value in Volts",
+    ),
+    (
         "psu_constant_current_output",
-        type="string",
-        default=None,
-        help="Set DC supply constant current output value in Amps",
-    )
-
+        "string",
+        None,
+        "Set DC supply constant current output value in Amps",
+    ),
     # Keysight U2723 Source Measure Unit Options
     ########################################################
-    parser.addini(
+    (
         "smu_serial_no",
-        type="string",
-        default=None,
-        help="Serial number of the (SMU) source measure unit device to connect to",
-    )
+        "string",
+        None,
+        "Serial number of the (SMU) source measure unit device to connect to",
+    ),
+    *(
+        (
+            f"smu_ch_{channel}_source_voltage",
+            "string",
+            None,
+            f"Set SMU Channel ({channel}) source voltage in Volts",
+        )
+        for channel in (1, 2, 3)
+    ),
+    *(
+        (
+            f"smu_ch_{channel}_source_current",
+            "string",
+            None,
+            f"Set SMU Channel ({channel}) source current in Amps",
+        )
+        for channel in (1, 2, 3)
+    ),
+)
 
-    parser.addini(
-        "smu_ch_1_source_voltage",
-        type="string",
-        default=None,
-        help="Set SMU Channel (1) source voltage in Volts",
-    )
 
-    parser.addini(
-        "smu_ch_2_source_voltage",
-        type="string",
-        default=None,
-        help="Set SMU Channel (2) source voltage in Volts",
-    )
+def pytest_addoption(parser: Parser):
+    for name, ini_type, default, help_text in INI_OPTIONS:
+        parser.addini(name, type=ini_type, default=default, help=help_text)
 
-    parser.addini(
-        "smu_ch_3_source_voltage",
-        type="string",
-        default=None,
-        help="Set SMU Channel (3) source voltage in Volts",
-    )
 
-    parser.addini(
-        "smu_ch_1_source_current",
-        type="string",
-        default=None,
-        help="Set SMU Channel (1) source current in Amps",
-    )
+def _open_resource_manager(pypm: SimpleNamespace) -> None:
+    """
+    Create the Pyvisa session used by the Keysight Wrapper classes (once per test session)
+
+    A failure (e.g. no VISA backend installed) is raised as RuntimeError, and again on every later call
+    """
+    if pypm.rm is not None:
+        return
+
+    if pypm.rm_error is not None:
+        raise RuntimeError(pypm.rm_error)
+
+    try:
+        # importing pyvisa loads the VISA bindings, defer it until a session is actually needed
+        import pyvisa
+
+        if pypm.xdist_worker:
+            # pytest-xdist workers start together: serialize loading the VISA library and share
+            # the enumeration of the bus between them
+            lock_file, cache_file = pypm.run_files
+            with file_lock(lock_file):
+                rm = pyvisa.ResourceManager()
+                devices = list_resources_cached(rm, cache_file)
+        else:
+            rm = pyvisa.ResourceManager()
+            devices = rm.list_resources()
+    except Exception as err:
+        pypm.rm_error = f"Could not create the PyVisa resource manager: {err}"
+        logging.error(pypm.rm_error)
+        raise RuntimeError(pypm.rm_error) from err
+
+    pypm.rm, pypm.devices = rm, devices
+    logging.info("PyVisa discovered the following devices: %s", pypm.devices)
+
+    # index the devices once, so the wrappers look up their instrument by serial number
+    pypm.serial_index = index_resources_by_serial(pypm.devices)
+
+
+def _bring_up(
+    pypm: SimpleNamespace,
+    name: str,
+    wrapper_cls: type,
+    serial_no: str,
+) -> None:
+    """
+    Open the connection to an instrument and clear its presets
+
+    Any failure (including VISA I/O errors) is recorded in pypm.errors instead of being raised,
+    the fixtures requesting the instrument report it (see get_instrument)
+    """
+    wrapper = None
+    try:
+        wrapper = wrapper_cls(
+            serial_no, pypm.rm, pypm.devices, pypm.serial_index
+        )
+
+        # open connection to instrument
+        wrapper.open()
+
+        # clear presets (the *cls in the preset sequence also clears the status)
+        wrapper.clear_presets()
+    except Exception as err:
+        # keep the session running; fixtures requesting the instrument report the error
+        logging.error("Could not open connection to %s: %s", name, err)
+        pypm.errors[name] = f"Could not open connection to {name}: {err}"
+        if wrapper is not None:
+            try:
+                wrapper.close()
+            except Exception:
+                pass
+        return
+
+    setattr(pypm, name, wrapper)
+
 
-    parser.addini(
-        "smu_ch_2_source_current",
-        type="string",
-        default=None,
-        help="Set SMU Channel (2) source current in Amps",
+def _tear_down(
+    wrapper: Union[KeysightU3606Wrapper, KeysightU2723Wrapper],
+    model: str,
+    query_errors: bool,
+) -> Optional[str]:
+    """
+    Log the last instrument error (if requested), clear presets and close the connection
+    A failure is logged instead of being raised, so the other instrument is still torn down
+    """
+    last_error = None
+    try:
+        if query_errors:
+            # query / clear system errors
+            last_error = wrapper.query_system_errors()
+            logging.info(
+                "Last error reported by Keysight %s instrument: %s",
+                model,
+                last_error,
+            )
+
+        # leave the outputs off / instrument idle for the next session
+        wrapper.clear_presets()
+    except Exception:
+        logging.exception("Could not reset Keysight %s instrument", model)
+
+    try:
+        # close Pyvisa session
+        wrapper.close()
+    except Exception:
+        logging.exception("Could not close Keysight %s instrument", model)
+
+    return last_error
+
+
+def get_instrument(
+    config: Config, name: str
+) -> Union[KeysightU3606Wrapper, KeysightU2723Wrapper]:
+    """Return the instrument ('psu' or 'smu') opened at session start (or on first use by xdist workers)"""
+    pypm = config.stash[PYPM_SESSION]
+
+    pending = pypm.pending.pop(name, None)
+    if pending is not None:
+        try:
+            _open_resource_manager(pypm)
+        except RuntimeError as err:
+            pypm.errors[name] = str(err)
+        else:
+            _bring_up(pypm, name, *pending)
+
+    wrapper = getattr(pypm, name)
+    if wrapper is None:
+        raise RuntimeError(
+            pypm.errors.get(
+                name,
+                f"pytest option: '{name}_serial_no' is not defined or invalid",
+            )
+        )
+    return wrapper
+
+
+def pytest_sessionstart(session: Session) -> None:
+    """Open the connections to the instruments configured in pytest.ini once for the whole test session"""
+    config = session.config
+
+    # the ini options are read once, the fixtures use this namespace instead of config.getini()
+    options = SimpleNamespace(
+        **{name: config.getini(name) for name, *_ in INI_OPTIONS}
     )
 
-    parser.addini(
-        "smu_ch_3_source_current",
-        type="string",
-        default=None,
-        help="Set SMU Channel (3) source current in Amps",
+    # PyVISA logs every transaction, only keep its warnings unless verbose logging is requested
+    if options.pyvisa_verbose:
+        import pyvisa
+
+        pyvisa.log_to_screen(logging.INFO)
+    else:
+        logging.getLogger("pyvisa").setLevel(logging.WARNING)
+
+    xdist_worker = hasattr(config, "workerinput")
+    pypm = SimpleNamespace(
+        rm=None,
+        rm_error=None,
+        devices=(),
+        serial_index={},
+        psu=None,
+        smu=None,
+        errors={},
+        pending={},
+        options=options,
+        xdist_worker=xdist_worker,
+        # lock / cache files shared by the workers of this test run only
+        run_files=(
+            visa_run_files(config.workerinput["testrunuid"])
+            if xdist_worker
+            else None
+        ),
     )
+    config.stash[PYPM_SESSION] = pypm
+
+    if options.psu_serial_no:
+        pypm.pending["psu"] = (KeysightU3606Wrapper, options.psu_serial_no)
+
+    if options.smu_serial_no:
+        pypm.pending["smu"] = (KeysightU2723Wrapper, options.smu_serial_no)
+
+    # the pytest-xdist controller does not run tests and its workers only bring up the
+    # instruments requested by their tests (see get_instrument)
+    if pypm.xdist_worker or getattr(config.option, "dist", "no") != "no":
+        return
+
+    if not pypm.pending:
+        return
+
+    instruments = [(name, *pending) for name, pending in pypm.pending.items()]
+    pypm.pending.clear()
+
+    try:
+        _open_resource_manager(pypm)
+    except RuntimeError as err:
+        # keep the session running; fixtures requesting the instruments report the error
+        for name, *_ in instruments:
+            pypm.errors[name] = str(err)
+        return
+
+    # the instruments sit behind independent USB endpoints, bring them up concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [
+            executor.submit(_bring_up, pypm, *instrument)
+            for instrument in instruments
+        ]:
+            future.result()
+
+
+def pytest_collection_modifyitems(config: Config, items: List[Item]) -> None:
+    """Pin the tests using the instruments to a single pytest-xdist worker (requires --dist loadgroup)"""
+    if not config.pluginmanager.hasplugin("xdist"):
+        return
+
+    for item in items:
+        if INSTRUMENT_FIXTURES.intersection(getattr(item, "fixturenames", ())):
+            item.add_marker(pytest.mark.xdist_group("pypm_instruments"))
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session: Session, exitstatus: int) -> None:
+    """Close the instrument connections after all session fixtures are torn down"""
+    pypm = session.config.stash.get(PYPM_SESSION, None)
+    if pypm is None:
+        return
+
+    instruments = []
+    if pypm.psu is not None:
+        instruments.append((pypm.psu, "U3606"))
+
+    if pypm.smu is not None:
+        instruments.append((pypm.smu, "U2723"))
+
+    pypm.psu = None
+    pypm.smu = None
+
+    # the instrument error queues are only worth a round trip when the session failed
+    query_errors = exitstatus != 0
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            model: executor.submit(_tear_down, wrapper, model, query_errors)
+            for wrapper, model in instruments
+        }
+        last_errors = {
+            model: future.result() for model, future in futures.items()
+        }
+
+    # keep the errors of the last failed session for debugging ('pytest --cache-show pypm/*')
+    cache = getattr(session.config, "cache", None)
+    if query_errors and instruments and cache is not None:
+        cache.set("pypm/last_error", last_errors)
+
+    # do not leave the resources cache of the run behind (a worker still starting up enumerates again)
+    if pypm.run_files is not None:
+        with contextlib.suppress(OSError):
+            os.remove(pypm.run_files[1])
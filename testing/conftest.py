@@ -1 +1,15 @@
+import logging
+
+import pytest
+import pyvisa
+
 pytest_plugins = ["pytester"]
+
+
+@pytest.fixture(scope="session")
+def pyvisa_manager() -> pyvisa.ResourceManager:
+    # the VISA backend is loaded once and shared by the context manager tests
+    pyvisa.log_to_screen(logging.INFO)
+    rm = pyvisa.ResourceManager()
+    yield rm
+    rm.close()
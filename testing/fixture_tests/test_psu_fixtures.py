@@ -1,16 +1,27 @@
 from pypm_test import KeysightU3606Wrapper
-from _pytest.config import Config
+from types import SimpleNamespace
 import pytest
 import time
 
 
+def _wait_for_continuous_mode(
+    psu: KeysightU3606Wrapper, status: int, timeout: float = 1.0
+) -> None:
+    """polls the continuous mode status until it is reached (or the timeout expires) instead of sleeping for the whole timeout"""
+    deadline = time.monotonic() + timeout
+    while psu.query_continuous_mode_status() != status:
+        if time.monotonic() > deadline:
+            return
+        time.sleep(0.02)
+
+
 def test_psu_fixture(
-    psu_handle: KeysightU3606Wrapper, pytestconfig: Config
+    psu_handle: KeysightU3606Wrapper, psu_config: SimpleNamespace
 ) -> None:
     assert isinstance(psu_handle, KeysightU3606Wrapper), (
         "wrong or None object type returend"
     )
-    assert pytestconfig.getini("psu_serial_no") == psu_handle._serial_no, (
+    assert psu_config.serial_no == psu_handle._serial_no, (
         "conntected device serial number invalid"
     )
     assert len(psu_handle._detected_devices) != 0, (
@@ -31,10 +42,11 @@ def test_psu_fixture(
 
 
 def test_psu_constant_voltage_output_fixture(
-    psu_constant_voltage_output: KeysightU3606Wrapper, pytestconfig: Config
+    psu_constant_voltage_output: KeysightU3606Wrapper,
+    psu_config: SimpleNamespace,
 ) -> None:
     assert (
-        pytestconfig.getini("psu_multimeter_mode").upper()
+        psu_config.multimeter_mode
         in psu_constant_voltage_output.query_multimeter_configuration()
     ), "incorrect multimeter configuration"
     assert psu_constant_voltage_output.query_dc_supply_output_status() == 1, (
@@ -43,14 +55,15 @@ def test_psu_constant_voltage_output_fixture(
     out_voltage_sense = (
         psu_constant_voltage_output.query_dc_supply_output_voltage()
     )
-    assert pytest.approx(out_voltage_sense, abs=1.0e-2) == float(
-        pytestconfig.getini("psu_constant_voltage_output")
+    assert (
+        pytest.approx(out_voltage_sense, abs=1.0e-2)
+        == psu_config.constant_voltage
     ), "Incorrect set voltage at output"
     assert isinstance(psu_constant_voltage_output.read(), float), (
         "Invalid / None return type of read"
     )
     psu_constant_voltage_output.enable_continuous_mode()
-    time.sleep(1)
+    _wait_for_continuous_mode(psu_constant_voltage_output, 1)
     assert psu_constant_voltage_output.query_continuous_mode_status() == 1, (
         "continuous mode not enabled"
     )
@@ -58,17 +71,18 @@ def test_psu_constant_voltage_output_fixture(
         "Invalid / None return type of fetch"
     )
     psu_constant_voltage_output.disable_continuous_mode()
-    time.sleep(1)
+    _wait_for_continuous_mode(psu_constant_voltage_output, 0)
     assert psu_constant_voltage_output.query_continuous_mode_status() == 0, (
         "continuous mode not disabled"
     )
 
 
 def test_psu_constant_current_output_fixture(
-    psu_constant_current_output: KeysightU3606Wrapper, pytestconfig: Config
+    psu_constant_current_output: KeysightU3606Wrapper,
+    psu_config: SimpleNamespace,
 ) -> None:
     assert (
-        pytestconfig.getini("psu_multimeter_mode").upper()
+        psu_config.multimeter_mode
         in psu_constant_current_output.query_multimeter_configuration()
     ), "incorrect multimeter configuration"
     assert psu_constant_current_output.query_dc_supply_output_status() == 1, (
@@ -77,14 +91,15 @@ def test_psu_constant_current_output_fixture(
     out_current_sense = (
         psu_constant_current_output.query_dc_supply_output_current()
     )
-    assert pytest.approx(out_current_sense, abs=1.0e-2) == float(
-        pytestconfig.getini("psu_constant_current_output")
+    assert (
+        pytest.approx(out_current_sense, abs=1.0e-2)
+        == psu_config.constant_current
     ), "Incorrect set current at output"
     assert isinstance(psu_constant_current_output.read(), float), (
         "Invalid / None return type of read"
     )
     psu_constant_current_output.enable_continuous_mode()
-    time.sleep(1)
+    _wait_for_continuous_mode(psu_constant_current_output, 1)
     assert psu_constant_current_output.query_continuous_mode_status() == 1, (
         "continuous mode not enabled"
     )
@@ -92,7 +107,7 @@ def test_psu_constant_current_output_fixture(
         "Invalid / None return type of fetch"
     )
     psu_constant_current_output.disable_continuous_mode()
-    time.sleep(1)
+    _wait_for_continuous_mode(psu_constant_current_output, 0)
     assert psu_constant_current_output.query_continuous_mode_status() == 0, (
         "continuous mode not disabled"
     )
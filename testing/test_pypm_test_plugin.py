@@ -13,15 +13,10 @@ import pyvisa
 import time
 
 
-@pytest.fixture
-def read_pytest_ini(request):
-    return pathlib.Path(request.config.rootdir, "pytest.ini").read_text()
-
-
-@pytest.fixture(scope="module")
-def pyvisa_resource() -> pyvisa.ResourceManager:
-    pyvisa.log_to_screen(logging.INFO)
-    return pyvisa.ResourceManager()
+@pytest.fixture(scope="session")
+def read_pytest_ini(pytestconfig):
+    # read once, the pytester runs of the fixture tests reuse the same ini content
+    return pathlib.Path(pytestconfig.rootdir, "pytest.ini").read_text()
 
 
 @pytest.mark.pytester_example_path("fixture_tests")
@@ -35,10 +30,10 @@ def test_psu_fixtures(testdir, read_pytest_ini) -> None:
     result.assert_outcomes(passed=3)
 
 
-def test_psu_context_manager(pyvisa_resource: pyvisa.ResourceManager) -> None:
+def test_psu_context_manager(pyvisa_manager: pyvisa.ResourceManager) -> None:
     logging.info("::::::Running PSU Context Manager::::::")
     with KeysightU3606SupplyAndMultimeter(
-        pyvisa_manager=pyvisa_resource,
+        pyvisa_manager=pyvisa_manager,
         serial_no="MXXX",
         dc_output_mode=DCOutputMode.CONSTANT_VOLTAGE,
         mulitimeter_mode=MultimeterMode.CURRENT,
@@ -47,16 +42,16 @@ def test_psu_context_manager(pyvisa_resource: pyvisa.ResourceManager) -> None:
         # enable output
         psu.enable_dc_output()
 
-        # perform discrete measurements
+        # take 100 measurements, triggered and transferred with a single query
         t_start = time.perf_counter()
-        for _ in range(100):
-            print(
-                f"Multimeter [READ] Current Measuremet: {psu.read() * 1000:.3f} mA"
-            )
+        current_data = psu.read_array(100)
         t_end = time.perf_counter()
 
         print(
-            f"Measurement Read via Keysight U3606 Multimeter took approx: {t_end - t_start:.3f} sec"
+            f"Multimeter [READ ARRAY] Current Measurement Points: {len(current_data)}, Last Current Measurement: {current_data[-1] * 1000:.3f} mA"
+        )
+        print(
+            f"Measurement Read Array via Keysight U3606 Multimeter took approx: {t_end - t_start:.3f} sec"
         )
 
         # change DC output voltage
@@ -66,12 +61,15 @@ def test_psu_context_manager(pyvisa_resource: pyvisa.ResourceManager) -> None:
         psu.enable_continuous_mode()
 
         t_start = time.perf_counter()
-        for _ in range(100):
-            print(
-                f"Multimeter [Fetch] Current Measuremet: {psu.fetch() * 1000:.3f} mA"
-            )
+        current_data = [psu.fetch() for _ in range(100)]
         t_end = time.perf_counter()
 
+        print(
+            "\n".join(
+                f"Multimeter [Fetch] Current Measuremet: {current * 1000:.3f} mA"
+                for current in current_data
+            )
+        )
         print(
             f"Measurement Fetch via Keysight U3606 Multimeter took approx: {t_end - t_start:.3f} sec"
         )
@@ -91,14 +89,12 @@ def test_smu_fixtures(testdir, read_pytest_ini) -> None:
     result.assert_outcomes(passed=3)
 
 
-def test_smu_context_manager() -> None:
+def test_smu_context_manager(pyvisa_manager: pyvisa.ResourceManager) -> None:
     logging.info("::::::Running SMU Context Manager::::::")
-    pyvisa_dev_manager = pyvisa.ResourceManager()
-    pyvisa.log_to_screen(logging.INFO)
 
     with (
         KeysightU2723SourceMeasureUnit(
-            pyvisa_manager=pyvisa_dev_manager,
+            pyvisa_manager=pyvisa_manager,
             serial_no="XXXX",
             smu_channel_1_output_mode=SMUChannelMode.SVMI,  # Source Voltage Measure Current
             smu_channel_1_output_value=3.6,  # Volts
@@ -112,15 +108,24 @@ def test_smu_context_manager() -> None:
 
         # perform discrete voltage and current measurements
         t_start = time.perf_counter()
-        for _ in range(100):
-            print(
-                f"CH1 (Voltage): {smu.measure_voltage_scalar(SMUChannel.CH1):.3f} V, CH1 (Current): {smu.measure_current_scalar(SMUChannel.CH1) * 1000:.3f} mA"
-            )
-            print(
-                f"CH2 (Voltage): {smu.measure_voltage_scalar(SMUChannel.CH2):.3f} V, CH2 (Current): {smu.measure_current_scalar(SMUChannel.CH2) * 1000:.3f} mA"
+        scalar_data = [
+            (
+                smu.measure_voltage_scalar(SMUChannel.CH1),
+                smu.measure_current_scalar(SMUChannel.CH1),
+                smu.measure_voltage_scalar(SMUChannel.CH2),
+                smu.measure_current_scalar(SMUChannel.CH2),
             )
+            for _ in range(100)
+        ]
         t_end = time.perf_counter()
 
+        print(
+            "\n".join(
+                f"CH1 (Voltage): {ch1_voltage:.3f} V, CH1 (Current): {ch1_current * 1000:.3f} mA\n"
+                f"CH2 (Voltage): {ch2_voltage:.3f} V, CH2 (Current): {ch2_current * 1000:.3f} mA"
+                for ch1_voltage, ch1_current, ch2_voltage, ch2_current in scalar_data
+            )
+        )
         print(
             f"Scalar measurements via Keysight U2723 SMU took approx: {t_end - t_start:.3f} sec"
         )
@@ -135,13 +140,14 @@ def test_smu_context_manager() -> None:
         t_start = time.perf_counter()
         current_data = smu.measure_current_array(SMUChannel.CH1)
         voltage_data = smu.measure_voltage_array(SMUChannel.CH2)
+        t_end = time.perf_counter()
+
         print(
             f"CH1 (Current Data Points): {len(current_data)}, CH1 (Last Current Data Point): {current_data[-1] * 1000:.3f} mA"
         )
         print(
             f"CH2 (Voltage Data Points): {len(voltage_data)}, CH1 (Last Voltage Data Point): {voltage_data[-1]:.3f} V"
         )
-        t_end = time.perf_counter()
 
         print(
             f"Array measurements via Keysight U2723 SMU took approx: {t_end - t_start:.3f} sec"
@@ -0,0 +1,246 @@
+import collections
+import pytest
+from pyvisa.constants import EventAttribute, StatusCode
+from pyvisa.errors import VisaIOError
+from pyvisa.resources.resource import WaitResponse
+from pypm_test import (
+    KeysightU2723Wrapper,
+    KeysightU3606Wrapper,
+    MultimeterMode,
+    SMUChannel,
+)
+from pypm_test import keysight_u3606_wrapper
+from pypm_test.instrument_utils import join_scpi_commands
+
+# Instrument wrapper tests against a fake VISA session, no instrument or VISA backend is needed
+
+SERIAL_NO = "MY00000001"
+# the LOG:DATA? messages sent by read_all_logged_data with 2 queries per message
+LOG_DATA_FIRST_MESSAGE = join_scpi_commands(
+    ["LOG:LOAD DATA"] + ["LOG:DATA?"] * 2
+)
+LOG_DATA_NEXT_MESSAGE = join_scpi_commands(["LOG:DATA?"] * 2)
+U3606_RESOURCE = f"USB0::0x2A8D::0x1301::{SERIAL_NO}::0::INSTR"
+U2723_RESOURCE = f"USB0::0x2A8D::0x3D18::{SERIAL_NO}::0::INSTR"
+
+
+class FakeVisaLibrary:
+    """visalib stand-in serving the asynchronous reads (viReadAsync) of a FakeResource"""
+
+    def __init__(self) -> None:
+        # responses returned by the next asynchronous reads
+        self.readings = collections.deque()
+        # event contexts of the completed reads, in completion order
+        self.completions = collections.deque()
+        # open event contexts: context -> job id
+        self.open_contexts = {}
+        self._buffers = {}
+        self._responses = {}
+
+    def read_asynchronously(self, session, count):
+        job_id = len(self._buffers) + 1
+        response = self.readings.popleft()
+        # the response fills only the start of the job buffer
+        buffer = bytearray(count)
+        buffer[: len(response)] = response
+        self._buffers[job_id] = buffer
+        self._responses[job_id] = response
+        context = 100 + job_id
+        self.open_contexts[context] = job_id
+        self.completions.append(context)
+        return buffer, job_id, StatusCode.success
+
+    def get_attribute(self, context, attribute):
+        # attributes can only be read while the event context is open
+        job_id = self.open_contexts[context]
+        if attribute == EventAttribute.job_id:
+            return job_id, StatusCode.success
+        if attribute == EventAttribute.return_count:
+            return len(self._responses[job_id]), StatusCode.success
+        raise NotImplementedError(attribute)
+
+    def get_buffer_from_id(self, job_id):
+        return self._buffers[job_id]
+
+    def close(self, context):
+        self.open_contexts.pop(context)
+
+
+class FakeResource:
+    """VISA session stand-in recording the messages written to it"""
+
+    def __init__(self, idn: str) -> None:
+        self.visalib = FakeVisaLibrary()
+        self.session = 1
+        self.timeout = 2000
+        self.chunk_size = 20 * 1024
+        self.read_termination = None
+        self.write_termination = "\r\n"
+        self.written = []
+        self.responses = {"*IDN?": idn}
+        # messages containing this command fail to be written
+        self.failing_command = None
+        self.closed = False
+
+    def write(self, message: str) -> None:
+        if self.failing_command and self.failing_command in message:
+            raise VisaIOError(StatusCode.error_io)
+        self.written.append(message)
+
+    def query(self, message: str) -> str:
+        self.written.append(message)
+        return self.responses[message]
+
+    def read_bytes(self, count: int, break_on_termchar: bool = False) -> bytes:
+        return (self.responses[self.written[-1]] + "\n").encode()
+
+    def enable_event(self, event_type, mechanism) -> None:
+        pass
+
+    def wait_on_event(self, event_type, timeout):
+        if not self.visalib.completions:
+            raise VisaIOError(StatusCode.error_timeout)
+        context = self.visalib.completions.popleft()
+        return WaitResponse(
+            event_type, context, StatusCode.success, self.visalib
+        )
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeResourceManager:
+    """resource manager stand-in opening the given fake session"""
+
+    def __init__(self, resource: FakeResource) -> None:
+        self.resource = resource
+
+    def open_resource(self, resource_name: str) -> FakeResource:
+        return self.resource
+
+
+@pytest.fixture
+def u3606_resource() -> FakeResource:
+    return FakeResource(f"Keysight Technologies,U3606B,{SERIAL_NO},1.0")
+
+
+@pytest.fixture
+def u3606(u3606_resource: FakeResource) -> KeysightU3606Wrapper:
+    wrapper = KeysightU3606Wrapper(
+        SERIAL_NO, FakeResourceManager(u3606_resource), (U3606_RESOURCE,)
+    )
+    wrapper.open()
+    yield wrapper
+    wrapper.close()
+
+
+@pytest.fixture
+def u2723_resource() -> FakeResource:
+    return FakeResource(f"Keysight Technologies,U2723A,{SERIAL_NO},1.0")
+
+
+def open_u2723(resource: FakeResource, **kwargs) -> KeysightU2723Wrapper:
+    wrapper = KeysightU2723Wrapper(
+        SERIAL_NO, FakeResourceManager(resource), (U2723_RESOURCE,), **kwargs
+    )
+    wrapper.open()
+    return wrapper
+
+
+def test_u3606_complete_measure(
+    u3606: KeysightU3606Wrapper, u3606_resource: FakeResource
+) -> None:
+    u3606_resource.visalib.readings.append(b"+1.25000000E-03\n")
+    job_id = u3606.submit_measure(MultimeterMode.CURRENT)
+    assert u3606.complete_measure(job_id) == pytest.approx(1.25e-3)
+    # the event context was closed once the completion was read
+    assert not u3606_resource.visalib.open_contexts
+
+
+def test_u3606_complete_measure_matches_job_id(
+    u3606: KeysightU3606Wrapper, u3606_resource: FakeResource
+) -> None:
+    u3606_resource.visalib.readings.extend([b"+1.0E+00\n", b"+2.0E+00\n"])
+    u3606.submit_measure(MultimeterMode.VOLTAGE)
+    second_job_id = u3606.submit_measure(MultimeterMode.VOLTAGE)
+    # the completion of the first job is dropped
+    assert u3606.complete_measure(second_job_id) == pytest.approx(2.0)
+    assert not u3606_resource.visalib.open_contexts
+    assert not u3606_resource.visalib.completions
+
+
+def test_u3606_read_all_logged_data(
+    u3606: KeysightU3606Wrapper,
+    u3606_resource: FakeResource,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        keysight_u3606_wrapper, "LOG_DATA_QUERIES_PER_MESSAGE", 2
+    )
+    u3606_resource.responses.update(
+        {
+            LOG_DATA_FIRST_MESSAGE: "+1.234E-03;-2.5",
+            LOG_DATA_NEXT_MESSAGE: "+3.0E+00;END",
+        }
+    )
+    logged_data = u3606.read_all_logged_data()
+    assert logged_data.tolist() == pytest.approx([1.234e-3, -2.5, 3.0])
+
+
+def test_u3606_read_all_logged_data_unexpected_record(
+    u3606: KeysightU3606Wrapper,
+    u3606_resource: FakeResource,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        keysight_u3606_wrapper, "LOG_DATA_QUERIES_PER_MESSAGE", 2
+    )
+    u3606_resource.responses[LOG_DATA_FIRST_MESSAGE] = "+1.0;OVLD"
+    with pytest.raises(RuntimeError, match="OVLD"):
+        u3606.read_all_logged_data()
+
+
+def test_u2723_background_write_error(u2723_resource: FakeResource) -> None:
+    u2723_resource.failing_command = "OUTP ON"
+    u2723_resource.responses["*OPC?"] = "1"
+    smu = open_u2723(u2723_resource, async_writes=True)
+    try:
+        smu.write("OUTP ON, (@1)")
+        # the failed background write is reported by the next sync point, once
+        with pytest.raises(
+            RuntimeError, match="Background write to instrument failed"
+        ):
+            smu.query("*OPC?")
+        assert smu.query("*OPC?") == "1"
+    finally:
+        smu.close()
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        lambda smu: smu.write("*RST"),
+        lambda smu: smu.recall_state(1),
+    ],
+    ids=["write", "recall_state"],
+)
+def test_u2723_shadow_invalidation(
+    u2723_resource: FakeResource, invalidate
+) -> None:
+    smu = open_u2723(u2723_resource)
+
+    def n_limit_writes() -> int:
+        return sum(
+            "SOUR:VOLT:LIM" in message for message in u2723_resource.written
+        )
+
+    smu.set_smu_voltage_limit(SMUChannel.CH1, 2.0)
+    # the channel already holds the value
+    smu.set_smu_voltage_limit(SMUChannel.CH1, 2.0)
+    assert n_limit_writes() == 1
+
+    # the command may have changed the channel state behind the setters
+    invalidate(smu)
+    smu.set_smu_voltage_limit(SMUChannel.CH1, 2.0)
+    assert n_limit_writes() == 2
+    smu.close()